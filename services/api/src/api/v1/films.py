@@ -2,15 +2,29 @@ from http import HTTPStatus
 from typing import Annotated, List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from models.film import Film
 from models.genre import Genre
 from models.person import Person
 from pydantic import BaseModel
 from services.film import FilmServiceABC, get_film_service
+from services.query_text import query_cache_key
+from services.response_cache import ResponseCache, get_response_cache
+from services.search import InvalidCursorError
+
+from .pagination import NEXT_PAGE_CURSOR_HEADER, check_page_depth, render_page
+from .search_query import canonical_query
 
 router = APIRouter()
 
+SEARCH_PHASE_HEADER = "X-Search-Phase"
+FILMS_BATCH_MAX_SIZE = 100
+
+
+def cursor_key(cursor: Optional[str]) -> Optional[str]:
+    # Cursors come from the client, long ones are hashed like long queries
+    return None if cursor is None else query_cache_key(cursor)
+
 
 class FilmItemResponse(BaseModel):
     uuid: UUID
@@ -60,12 +74,14 @@ class FilmDetailResponse(BaseModel):
     response_model=list[FilmItemResponse],
     summary="Films list",
     description="Returns a list of films with their names and IMDb ratings. "
-    "You can sort by IMDb rating or filter by genre",
+    "You can sort by IMDb rating or filter by genre. The cursor to the next "
+    f"page is returned in the {NEXT_PAGE_CURSOR_HEADER} header",
     response_description="Film name and IMDb rating",
     tags=["films"],
 )
 async def list_films(
     film_service: Annotated[FilmServiceABC, Depends(get_film_service)],
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
     sort: Literal["imdb_rating", "-imdb_rating"] = Query(
         "-imdb_rating",
         examples=["-imdb_rating", "imdb_rating"],
@@ -77,12 +93,32 @@ async def list_films(
     ),
     page_size: int = Query(50, ge=1, le=100),
     page_number: int = Query(1, ge=1),
-) -> list[FilmItemResponse]:
-    films = await film_service.list_films(
-        page_size, page_number, genre_id=genre, sort=sort
-    )
+    cursor: Optional[str] = Query(
+        None, description="Cursor to the next page, page_number is ignored"
+    ),
+) -> Response:
+    if cursor is None:
+        check_page_depth(page_size, page_number)
+
+    async def build() -> Response:
+        try:
+            page = await film_service.list_films(
+                page_size, page_number, genre_id=genre, sort=sort, cursor=cursor
+            )
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="invalid cursor"
+            )
+
+        return render_page(
+            [FilmItemResponse.from_model(f) for f in page.items], page.next_cursor
+        )
 
-    return [FilmItemResponse.from_model(f) for f in films]
+    return await response_cache.respond(
+        ("films", "list", sort, genre, page_size, page_number, cursor_key(cursor)),
+        build,
+        namespaces=("movies",),
+    )
 
 
 @router.get(
@@ -90,19 +126,82 @@ async def list_films(
     response_model=list[FilmItemResponse],
     summary="Full-text search",
     description="Returns a list of films matching the search query. "
-    "You can search by title, genres, description, actors, directors, and writers.",
+    "You can search by title, genres, description, actors, directors, and writers. "
+    f"The cursor to the next page is returned in the {NEXT_PAGE_CURSOR_HEADER} header. "
+    "Misspelled words are only matched fuzzily when too few films match exactly, "
+    f"the {SEARCH_PHASE_HEADER} header tells which search answered",
     response_description="Film name and IMDb rating",
     tags=["films"],
 )
 async def search_films(
     film_service: Annotated[FilmServiceABC, Depends(get_film_service)],
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
     query: str = Query(..., min_length=1, description="Search query"),
     page_size: int = Query(50, ge=1, le=100),
     page_number: int = Query(1, ge=1),
-) -> list[FilmItemResponse]:
-    films = await film_service.search_films(query, page_size, page_number)
+    cursor: Optional[str] = Query(
+        None, description="Cursor to the next page, page_number is ignored"
+    ),
+) -> Response:
+    query = canonical_query(query)
+    if cursor is None:
+        check_page_depth(page_size, page_number)
+
+    async def build() -> Response:
+        try:
+            page = await film_service.search_films(
+                query, page_size, page_number, cursor=cursor
+            )
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="invalid cursor"
+            )
+
+        headers = {}
+        if page.search_phase is not None:
+            headers[SEARCH_PHASE_HEADER] = page.search_phase
+        return render_page(
+            [FilmItemResponse.from_model(f) for f in page.items],
+            page.next_cursor,
+            headers=headers,
+        )
 
-    return [FilmItemResponse.from_model(f) for f in films]
+    return await response_cache.respond(
+        (
+            "films",
+            "search",
+            query_cache_key(query),
+            page_size,
+            page_number,
+            cursor_key(cursor),
+        ),
+        build,
+        namespaces=("movies",),
+    )
+
+
+@router.get(
+    "/batch",
+    response_model=list[FilmDetailResponse],
+    summary="Films by IDs",
+    description="Returns detailed information about several films by their IDs "
+    "in the order of the ids parameter. A repeated ID returns its film once, at "
+    "its first position. Unknown IDs are omitted from the response without an "
+    "error, compare the returned uuids with the requested ones to find them.",
+    response_description="Detailed information about the films",
+    tags=["films"],
+)
+async def get_films_by_ids(
+    film_service: Annotated[FilmServiceABC, Depends(get_film_service)],
+    ids: list[UUID] = Query(..., min_length=1, max_length=FILMS_BATCH_MAX_SIZE),
+) -> list[FilmDetailResponse]:
+    film_ids = list(dict.fromkeys(str(film_id) for film_id in ids))
+    films = await film_service.get_many(film_ids)
+    return [
+        FilmDetailResponse.from_model(film)
+        for film in films.values()
+        if film is not None
+    ]
 
 
 @router.get(
@@ -114,11 +213,19 @@ async def search_films(
     tags=["films"],
 )
 async def get_film_by_id(
-    film_id: str,
+    film_id: UUID,
     film_service: Annotated[FilmServiceABC, Depends(get_film_service)],
-) -> FilmDetailResponse:
-    film = await film_service.get_by_id(film_id)
-    if not film:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="film not found")
-
-    return FilmDetailResponse.from_model(film)
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+) -> Response:
+    async def build() -> FilmDetailResponse:
+        film = await film_service.get_by_id(str(film_id))
+        if not film:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="film not found"
+            )
+
+        return FilmDetailResponse.from_model(film)
+
+    return await response_cache.respond(
+        ("films", film_id), build, namespaces=("movies",)
+    )
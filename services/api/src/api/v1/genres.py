@@ -1,11 +1,13 @@
 from http import HTTPStatus
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from models.genre import Genre
 from pydantic import BaseModel
 from services.genre import GenreService, get_genre_service
+from services.genre_catalog import GenreCatalog, get_genre_catalog
+from services.response_cache import ResponseCache, get_response_cache
 
 router = APIRouter()
 
@@ -19,6 +21,11 @@ class GenreResponse(BaseModel):
         return cls(uuid=genre.id, name=genre.name)
 
 
+def is_catalog_loaded(genre_catalog: Optional[GenreCatalog]) -> bool:
+    # Genres of a loaded catalog are rendered from memory, without Redis
+    return genre_catalog is not None and genre_catalog.snapshot is not None
+
+
 @router.get(
     "/",
     response_model=List[GenreResponse],
@@ -28,11 +35,21 @@ class GenreResponse(BaseModel):
 )
 async def list_genres(
     genre_service: Annotated[GenreService, Depends(get_genre_service)],
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+    genre_catalog: Annotated[Optional[GenreCatalog], Depends(get_genre_catalog)],
     page_size: int = Query(50, ge=1, le=100),
     page_number: int = Query(1, ge=1),
-) -> list[GenreResponse]:
-    genres = await genre_service.list_genres(page_size, page_number)
-    return [GenreResponse.from_model(genre) for genre in genres]
+) -> Response:
+    async def build() -> list[GenreResponse]:
+        genres = await genre_service.list_genres(page_size, page_number)
+        return [GenreResponse.from_model(genre) for genre in genres]
+
+    return await response_cache.respond(
+        ("genres", "list", page_size, page_number),
+        build,
+        namespaces=("genres",),
+        cacheable=not is_catalog_loaded(genre_catalog),
+    )
 
 
 @router.get(
@@ -42,11 +59,23 @@ async def list_genres(
     tags=["genres"],
 )
 async def genre_details(
-    genre_id: str,
+    genre_id: UUID,
     genre_service: Annotated[GenreService, Depends(get_genre_service)],
-) -> GenreResponse:
-    genre = await genre_service.get_by_id(genre_id)
-    if not genre:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="genre not found")
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+    genre_catalog: Annotated[Optional[GenreCatalog], Depends(get_genre_catalog)],
+) -> Response:
+    async def build() -> GenreResponse:
+        genre = await genre_service.get_by_id(str(genre_id))
+        if not genre:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="genre not found"
+            )
+
+        return GenreResponse.from_model(genre)
 
-    return GenreResponse.from_model(genre)
+    return await response_cache.respond(
+        ("genres", genre_id),
+        build,
+        namespaces=("genres",),
+        cacheable=not is_catalog_loaded(genre_catalog),
+    )
@@ -0,0 +1,34 @@
+from http import HTTPStatus
+from typing import Any, Optional
+
+from core.config import settings
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+NEXT_PAGE_CURSOR_HEADER = "X-Next-Page-Cursor"
+
+
+def check_page_depth(page_size: int, page_number: int) -> None:
+    """Reject offset pages past ``settings.search_max_offset``.
+
+    Deeper pages are only reachable with the cursor from the previous page.
+    """
+    if page_size * page_number > settings.search_max_offset:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f"page_size * page_number must not exceed "
+            f"{settings.search_max_offset}, use the cursor from the "
+            f"{NEXT_PAGE_CURSOR_HEADER} header to get further pages",
+        )
+
+
+def render_page(
+    items: list[Any],
+    next_cursor: Optional[str],
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    headers = dict(headers or {})
+    if next_cursor is not None:
+        headers[NEXT_PAGE_CURSOR_HEADER] = next_cursor
+    return ORJSONResponse(content=jsonable_encoder(items), headers=headers)
@@ -4,12 +4,17 @@ from typing import Annotated, Iterable, List
 from uuid import UUID
 
 from api.v1.films import FilmItemResponse
-from fastapi import APIRouter, Depends, HTTPException, Query
+from api.v1.search_query import canonical_query
+from core.config import settings
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from models.film import Film
-from models.person import Person
+from models.person import Person, PersonDetails, PersonFilm
 from pydantic import BaseModel
+from services.deadline import load_then_dependent
 from services.film import FilmService, get_film_service
 from services.person import PersonService, get_person_service
+from services.query_text import query_cache_key
+from services.response_cache import ResponseCache, get_response_cache
 
 router = APIRouter()
 
@@ -34,11 +39,14 @@ class PersonDetailsResponseFilms(BaseModel):
                 (RoleName.WRITER, film.writers),
             ]
             if any(film_person.id == person.id for film_person in film_persons)
-            is not None
         ]
 
         return cls(uuid=film.id, roles=roles)
 
+    @classmethod
+    def from_person_film(cls, film: PersonFilm) -> "PersonDetailsResponseFilms":
+        return cls(uuid=film.id, roles=[RoleName(role) for role in film.roles])
+
 
 class PersonResponse(BaseModel):
     uuid: UUID
@@ -56,6 +64,23 @@ class PersonResponse(BaseModel):
 
         return cls(uuid=person.id, name=person.name, films=person_films_response)
 
+    @classmethod
+    def from_person(
+        cls, person: PersonDetails, person_films: Iterable[Film] = ()
+    ) -> "PersonResponse":
+        """Uses the filmography stored in the person document when it has one."""
+        if person.films is None:
+            return cls.from_models(person, person_films)
+
+        return cls(
+            uuid=person.id,
+            name=person.name,
+            films=[
+                PersonDetailsResponseFilms.from_person_film(film)
+                for film in person.films
+            ],
+        )
+
 
 @router.get(
     "/search",
@@ -69,18 +94,29 @@ class PersonResponse(BaseModel):
 async def search_person_by_name(
     person_service: Annotated[PersonService, Depends(get_person_service)],
     film_service: Annotated[FilmService, Depends(get_film_service)],
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
     query: str = Query(..., min_length=1, description="Person name to search for"),
     page_size: int = Query(50, ge=1, le=100),
     page_number: int = Query(1, ge=1),
-) -> List[PersonResponse]:
-    persons = await person_service.search_by_name(query, page_size, page_number)
+) -> Response:
+    query = canonical_query(query)
 
-    return [
-        PersonResponse.from_models(
-            person, await film_service.get_films_with_person(str(person.id), 1000, 1)
+    async def build() -> List[PersonResponse]:
+        persons = await person_service.search_by_name(query, page_size, page_number)
+        person_films = await film_service.get_films_with_persons(
+            [str(person.id) for person in persons if person.films is None], 1000, 1
         )
-        for person in persons
-    ]
+
+        return [
+            PersonResponse.from_person(person, person_films.get(str(person.id), ()))
+            for person in persons
+        ]
+
+    return await response_cache.respond(
+        ("persons", "search", query_cache_key(query), page_size, page_number),
+        build,
+        namespaces=("persons", "movies"),
+    )
 
 
 @router.get(
@@ -91,13 +127,21 @@ async def search_person_by_name(
 )
 async def get_person_films(
     film_service: Annotated[FilmService, Depends(get_film_service)],
-    person_id: str,
-) -> List[FilmItemResponse]:
-    films = await film_service.get_films_with_person(person_id, 1000, 1)
-    if not films:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="No persons found")
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+    person_id: UUID,
+) -> Response:
+    async def build() -> List[FilmItemResponse]:
+        films = await film_service.get_films_with_person(str(person_id), 1000, 1)
+        if not films:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="No persons found"
+            )
+
+        return [FilmItemResponse.from_model(film) for film in films]
 
-    return [FilmItemResponse.from_model(film) for film in films]
+    return await response_cache.respond(
+        ("persons", person_id, "films"), build, namespaces=("movies",)
+    )
 
 
 @router.get(
@@ -109,13 +153,29 @@ async def get_person_films(
 async def get_person_by_id(
     person_service: Annotated[PersonService, Depends(get_person_service)],
     film_service: Annotated[FilmService, Depends(get_film_service)],
-    person_id: str,
-) -> PersonResponse:
-    person = await person_service.get_by_id(person_id)
-
-    person_films = await film_service.get_films_with_person(person_id, 1000, 1)
-
-    if not person:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="person not found")
-
-    return PersonResponse.from_models(person, person_films)
+    response_cache: Annotated[ResponseCache, Depends(get_response_cache)],
+    person_id: UUID,
+) -> Response:
+    async def build() -> PersonResponse:
+        try:
+            person, person_films = await load_then_dependent(
+                person_service.get_by_id(str(person_id)),
+                lambda _: film_service.get_films_with_person(str(person_id), 1000, 1),
+                needs_dependent=lambda person: person.films is None,
+                timeout=settings.composite_request_timeout,
+            )
+        except TimeoutError:
+            raise HTTPException(
+                status_code=HTTPStatus.GATEWAY_TIMEOUT, detail="person lookup timed out"
+            )
+
+        if not person:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND, detail="person not found"
+            )
+
+        return PersonResponse.from_person(person, person_films or ())
+
+    return await response_cache.respond(
+        ("persons", person_id), build, namespaces=("persons", "movies")
+    )
@@ -0,0 +1,22 @@
+from http import HTTPStatus
+
+from core.config import settings
+from fastapi import HTTPException
+from services.query_text import normalize_query
+
+
+def canonical_query(query: str) -> str:
+    """Normalize a search query parameter and reject blank queries.
+
+    The canonical query is used both for the search and the cache keys.
+    """
+    query = normalize_query(
+        query, strip_stopwords=settings.search_query_strip_stopwords
+    )
+    if not query:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail="query must not be blank",
+        )
+
+    return query
@@ -22,5 +22,52 @@ class Settings(BaseSettings):
     redis_host: str
     redis_port: str
 
+    cache_local_enabled: bool = True
+    cache_local_max_entries: int = 10_000
+    cache_local_max_bytes: int = 64 * 1024 * 1024
+    cache_local_ttl: int = 10
+    # Cache counters are logged on this interval, 0 disables the reports
+    stats_log_interval: float = 60
+
+    cache_compression_enabled: bool = True
+    cache_compression_min_size: int = 1024
+
+    cache_stale_while_revalidate: bool = True
+    cache_stale_ttl: int = 60 * 5
+    cache_negative_ttl: int = 30
+
+    cache_early_expiration: bool = False
+    cache_early_expiration_beta: float = 1.0
+
+    cache_invalidation_enabled: bool = True
+    cache_invalidation_channel: str = "cache:invalidation"
+    cache_generation_memo_ttl: float = 1.0
+
+    search_max_offset: int = 10_000
+    # Fuzzy search only runs when fewer films match the query exactly
+    search_fuzzy_fallback_min_hits: int = 5
+    # Drop the ru_en analyzer stopwords from search queries before caching
+    search_query_strip_stopwords: bool = False
+    # Film and genre lists are cached in aligned windows of this many items,
+    # it should divide search_max_offset
+    list_cache_window_size: int = 100
+    # Serve films sorted by -imdb_rating from the Redis sets kept by the ETL
+    film_rating_index_enabled: bool = True
+    # Keep all genres in process memory, reloaded on this interval and on
+    # every ETL change of the genres index
+    genre_catalog_enabled: bool = True
+    genre_catalog_max_size: int = 1000
+    genre_catalog_refresh_interval: float = 60
+    composite_request_timeout: float = 5
+
+    response_cache_enabled: bool = True
+    response_cache_ttl: int = 60
+
+    cache_warmup_enabled: bool = True
+    cache_warmup_film_pages: int = 3
+    cache_warmup_page_size: int = 50
+    cache_warmup_film_ids: list[str] = []
+    cache_warmup_timeout: float = 30
+
 
 settings = Settings(_env_file=dotenv_path, _env_file_encoding="utf-8")  # type: ignore
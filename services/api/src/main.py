@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from api.v1 import films, genres, persons
 from core.config import settings
@@ -8,6 +9,10 @@ from elasticsearch import AsyncElasticsearch
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 from redis.asyncio import Redis
+from services.genre_catalog import get_genre_catalog
+from services.invalidation import get_cache_invalidation_subscriber
+from services.stats import get_stats_reporter
+from services.warmup import get_cache_warmer
 
 
 @asynccontextmanager
@@ -15,8 +20,29 @@ async def lifespan(app: FastAPI):
     init_redis(Redis(host=settings.redis_host, port=settings.redis_port))
     init_elastic(AsyncElasticsearch(hosts=[settings.es_url]))
 
+    genre_catalog = get_genre_catalog()
+    if genre_catalog is not None:
+        await genre_catalog.refresh()
+
+    if settings.cache_warmup_enabled:
+        await get_cache_warmer().warm_up()
+
+    background_tasks = []
+    if genre_catalog is not None:
+        background_tasks.append(asyncio.create_task(genre_catalog.run()))
+    if settings.cache_invalidation_enabled:
+        subscriber = get_cache_invalidation_subscriber()
+        background_tasks.append(asyncio.create_task(subscriber.run()))
+    if settings.stats_log_interval > 0:
+        background_tasks.append(asyncio.create_task(get_stats_reporter().run()))
+
     yield
 
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
     await close_redis()
     await close_elastic()
 
@@ -1,3 +1,4 @@
+from enum import StrEnum
 from typing import Optional
 from uuid import UUID
 
@@ -24,3 +25,24 @@ class Film(BaseModel):
 
     writers: list[Person]
     writers_names: list[str] = []
+
+
+class SearchPhase(StrEnum):
+    EXACT = "exact"
+    FUZZY = "fuzzy"
+
+
+class FilmPage(BaseModel):
+    items: list[Film]
+    next_cursor: Optional[str] = None
+    search_phase: Optional[SearchPhase] = None
+
+
+class FilmIdPage(BaseModel):
+    """Ordered ids of a film list page, the films are cached separately."""
+
+    ids: list[str]
+    next_cursor: Optional[str] = None
+    search_phase: Optional[SearchPhase] = None
+    # Cursor after each film, set on windows to cut pages from them
+    item_cursors: list[str] = []
@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -6,3 +7,13 @@ from pydantic import BaseModel
 class Person(BaseModel):
     id: UUID
     name: str
+
+
+class PersonFilm(BaseModel):
+    id: UUID
+    roles: list[str]
+
+
+class PersonDetails(Person):
+    # None for documents indexed before the ETL started storing filmographies
+    films: Optional[list[PersonFilm]] = None
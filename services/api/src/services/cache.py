@@ -1,12 +1,335 @@
-from typing import Optional, Protocol
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Mapping, Optional, Protocol
 
+from core.config import settings
 from db.redis import get_redis
+from redis.asyncio import Redis
+
+from .stats import get_stats_reporter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MARKER_SIZE = 2
+ZSTD_MARKER = b"\x00s"
+LZ4_MARKER = b"\x00l"
+ZLIB_MARKER = b"\x00z"
+# Reserved for every codec, including ones not installed in this process
+COMPRESSION_MARKERS = frozenset({ZSTD_MARKER, LZ4_MARKER, ZLIB_MARKER})
 
 
 class CacheServiceProtocol(Protocol):
-    async def get(self, key: str) -> Optional[str]: ...
-    async def set(self, key: str, value: str, expire: int): ...
+    async def get(self, key: str) -> Optional[bytes]: ...
+    async def mget(self, *keys: str) -> list[Optional[bytes]]: ...
+    async def set(self, key: str, value: bytes, expire: int): ...
+    async def set_many(self, values: Mapping[str, bytes], expire: int): ...
+    async def delete(self, *keys: str): ...
+
+
+class RedisCacheService:
+    """Cache over a Redis client, batch writes are sent in one pipeline."""
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.redis.get(key)
+
+    async def mget(self, *keys: str) -> list[Optional[bytes]]:
+        return await self.redis.mget(*keys)
+
+    async def set(self, key: str, value: bytes, expire: int):
+        await self.redis.set(key, value, ex=expire)
+
+    async def set_many(self, values: Mapping[str, bytes], expire: int):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=expire)
+            await pipe.execute()
+
+    async def delete(self, *keys: str):
+        await self.redis.delete(*keys)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class LocalLRUCache:
+    """Bounded in-process LRU cache with per-key TTL.
+
+    Entries are evicted in least-recently-used order once either the number
+    of entries or their total size in bytes exceeds the configured limits.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, max_ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, bytes, int]] = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, expire: int) -> None:
+        self.delete(key)
+
+        ttl = min(expire, self.max_ttl)
+        size = len(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value, size)
+        self._size += size
+
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+@dataclass(frozen=True)
+class CompressionCodec:
+    marker: bytes
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def get_compression_codecs() -> list[CompressionCodec]:
+    """Available codecs, from the most to the least preferred one."""
+    codecs = []
+    if zstandard is not None:
+        codecs.append(
+            CompressionCodec(
+                marker=ZSTD_MARKER,
+                compress=zstandard.ZstdCompressor().compress,
+                decompress=zstandard.ZstdDecompressor().decompress,
+            )
+        )
+    if lz4_frame is not None:
+        codecs.append(
+            CompressionCodec(
+                marker=LZ4_MARKER,
+                compress=lz4_frame.compress,
+                decompress=lz4_frame.decompress,
+            )
+        )
+    codecs.append(
+        CompressionCodec(
+            marker=ZLIB_MARKER, compress=zlib.compress, decompress=zlib.decompress
+        )
+    )
+    return codecs
 
 
+@dataclass
+class CompressionStats:
+    compressed: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    saved_bytes: int = 0
+
+
+class CompressedCacheService:
+    """Compresses values above ``min_size`` bytes before storing them.
+
+    Compressed values start with the marker of their codec, values without
+    a known marker are returned unchanged, so entries written before
+    compression was enabled keep decoding. Values compressed by a codec that
+    is not installed here, e.g. by a replica with ``zstandard``, read as
+    misses.
+    """
+
+    def __init__(
+        self,
+        cache: CacheServiceProtocol,
+        min_size: int,
+        codecs: list[CompressionCodec],
+    ):
+        self.cache = cache
+        self.min_size = min_size
+        self.codec = codecs[0]
+        self.codecs = {codec.marker: codec for codec in codecs}
+        self.stats = CompressionStats()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self.cache.get(key)
+        if value is None:
+            return None
+
+        return self._decompress(key, value)
+
+    async def mget(self, *keys: str) -> list[Optional[bytes]]:
+        values = await self.cache.mget(*keys)
+        return [
+            None if value is None else self._decompress(key, value)
+            for key, value in zip(keys, values)
+        ]
+
+    async def set(self, key: str, value: bytes, expire: int):
+        await self.cache.set(key, self._compress(value), expire)
+
+    async def set_many(self, values: Mapping[str, bytes], expire: int):
+        await self.cache.set_many(
+            {key: self._compress(value) for key, value in values.items()}, expire
+        )
+
+    async def delete(self, *keys: str):
+        await self.cache.delete(*keys)
+
+    def _compress(self, value: bytes) -> bytes:
+        if len(value) < self.min_size:
+            return value
+
+        compressed = self.codec.marker + self.codec.compress(value)
+        if len(compressed) >= len(value):
+            return value
+
+        self.stats.compressed += 1
+        self.stats.bytes_before += len(value)
+        self.stats.bytes_after += len(compressed)
+        self.stats.saved_bytes += len(value) - len(compressed)
+        return compressed
+
+    def _decompress(self, key: str, value: bytes) -> Optional[bytes]:
+        marker = value[:COMPRESSION_MARKER_SIZE]
+        if marker not in COMPRESSION_MARKERS:
+            return value
+
+        codec = self.codecs.get(marker)
+        if codec is None:
+            logger.warning("No codec to decompress cached value of %s", key)
+            return None
+
+        try:
+            return codec.decompress(value[COMPRESSION_MARKER_SIZE:])
+        except Exception:
+            logger.warning("Failed to decompress cached value of %s", key)
+            return None
+
+
+class TwoTierCacheService:
+    """Cache with an in-process LRU layer in front of a shared remote cache.
+
+    Values read from the remote cache are kept locally for at most
+    ``local.max_ttl`` seconds, so hot keys are served without a network hop.
+    """
+
+    def __init__(self, remote: CacheServiceProtocol, local: LocalLRUCache):
+        self.remote = remote
+        self.local = local
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.local.stats
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        value = await self.remote.get(key)
+        if value is not None:
+            self.local.set(key, value, self.local.max_ttl)
+
+        return value
+
+    async def mget(self, *keys: str) -> list[Optional[bytes]]:
+        values = {key: self.local.get(key) for key in keys}
+
+        missing = [key for key, value in values.items() if value is None]
+        if missing:
+            for key, value in zip(missing, await self.remote.mget(*missing)):
+                if value is not None:
+                    self.local.set(key, value, self.local.max_ttl)
+                values[key] = value
+
+        return [values[key] for key in keys]
+
+    async def set(self, key: str, value: bytes, expire: int):
+        self.local.set(key, value, expire)
+        await self.remote.set(key, value, expire)
+
+    async def set_many(self, values: Mapping[str, bytes], expire: int):
+        for key, value in values.items():
+            self.local.set(key, value, expire)
+        await self.remote.set_many(values, expire)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.local.delete(key)
+        await self.remote.delete(*keys)
+
+
+@lru_cache()
 def get_cache_service() -> CacheServiceProtocol:
-    return get_redis()
+    remote: CacheServiceProtocol = RedisCacheService(get_redis())
+    if settings.cache_compression_enabled:
+        compressed = CompressedCacheService(
+            remote,
+            min_size=settings.cache_compression_min_size,
+            codecs=get_compression_codecs(),
+        )
+        get_stats_reporter().register("cache_compression", compressed.stats)
+        remote = compressed
+
+    if not settings.cache_local_enabled:
+        return remote
+
+    local = LocalLRUCache(
+        max_entries=settings.cache_local_max_entries,
+        max_bytes=settings.cache_local_max_bytes,
+        max_ttl=settings.cache_local_ttl,
+    )
+    get_stats_reporter().register("local_cache", local.stats)
+    return TwoTierCacheService(remote, local)
@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import math
+import random
+import struct
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional, Sequence, TypeVar
+
+from core.config import settings
+
+from .cache import CacheServiceProtocol, get_cache_service
+from .single_flight import SingleFlight, get_single_flight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ENTRY_MARKER = b"\x00\x01"
+ENTRY_HEADER = struct.Struct("!dd")
+HEADER_SIZE = len(ENTRY_MARKER) + ENTRY_HEADER.size
+
+TOMBSTONE = b"\x00-"
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Cached value with the moment it stops being fresh.
+
+    ``delta`` is how long the value took to compute, in seconds. It is used
+    to expire expensive entries early with a probability growing towards
+    ``soft_expires_at`` (XFetch), so that replicas sharing the cache refresh
+    it at different moments instead of all at once.
+    """
+
+    value: bytes
+    soft_expires_at: float
+    delta: float = 0.0
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "CacheEntry":
+        if not raw.startswith(ENTRY_MARKER):
+            # Plain values written without an envelope stay fresh until
+            # the cache backend expires them.
+            return cls(value=raw, soft_expires_at=math.inf)
+
+        soft_expires_at, delta = ENTRY_HEADER.unpack_from(raw, len(ENTRY_MARKER))
+        return cls(
+            value=raw[HEADER_SIZE:], soft_expires_at=soft_expires_at, delta=delta
+        )
+
+    def encode(self) -> bytes:
+        header = ENTRY_HEADER.pack(self.soft_expires_at, self.delta)
+        return ENTRY_MARKER + header + self.value
+
+    def is_fresh(self, now: float, beta: float = 0.0) -> bool:
+        if beta > 0 and self.delta > 0:
+            now -= self.delta * beta * math.log(1.0 - random.random())
+
+        return now < self.soft_expires_at
+
+
+class CacheAside:
+    """Read-through cache used by the entity services.
+
+    Misses are loaded through ``SingleFlight``. Every entry has a soft TTL
+    (``ttl``) and a hard TTL (``ttl + stale_ttl``). Between the two the stale
+    value is returned immediately while a background task refreshes it.
+    With ``stale_ttl == 0`` expired entries are reloaded on the request path.
+
+    Loads that find nothing are remembered as tombstones for ``negative_ttl``
+    seconds, so repeated lookups of missing ids do not reach the backend.
+    Cached values that fail to decode are reloaded like misses.
+
+    A positive ``early_expiration_beta`` enables probabilistic early
+    expiration, larger values make early refreshes more likely.
+    """
+
+    def __init__(
+        self,
+        cache: CacheServiceProtocol,
+        single_flight: SingleFlight,
+        stale_ttl: int = 0,
+        negative_ttl: int = 0,
+        early_expiration_beta: float = 0.0,
+    ):
+        self.cache = cache
+        self.single_flight = single_flight
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.early_expiration_beta = early_expiration_beta
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Optional[T]]],
+        ttl: int,
+        encode: Callable[[T], str | bytes],
+        decode: Callable[[bytes], T],
+    ) -> Optional[T]:
+        raw = await self.cache.get(key)
+        if raw == TOMBSTONE:
+            return None
+
+        decoded = self._decode(key, raw, decode) if raw is not None else None
+        if decoded is not None:
+            entry, value = decoded
+            if entry.is_fresh(time.time(), self.early_expiration_beta):
+                return value
+
+            if self.stale_ttl > 0:
+                self._refresh_in_background(key, load, ttl, encode)
+                return value
+
+        return await self.single_flight.do(
+            key, lambda: self._load(key, load, ttl, encode)
+        )
+
+    async def get_many_or_load(
+        self,
+        keys: Sequence[str],
+        load: Callable[[list[str]], Awaitable[dict[str, Optional[T]]]],
+        ttl: int,
+        encode: Callable[[T], str | bytes],
+        decode: Callable[[bytes], T],
+    ) -> dict[str, Optional[T]]:
+        """Batch version of ``get_or_load``.
+
+        All keys are read in one round-trip and the missing ones are loaded
+        with a single ``load`` call, which gets the missing keys and returns
+        the values by key. Loaded values are written back in one batch.
+        Batch loads are not deduplicated by ``SingleFlight``.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        results: dict[str, Optional[T]] = {}
+        missing = []
+        now = time.time()
+        for key, raw in zip(keys, await self.cache.mget(*keys)):
+            if raw == TOMBSTONE:
+                results[key] = None
+                continue
+
+            decoded = self._decode(key, raw, decode) if raw is not None else None
+            if decoded is not None:
+                entry, value = decoded
+                if entry.is_fresh(now, self.early_expiration_beta):
+                    results[key] = value
+                    continue
+
+                if self.stale_ttl > 0:
+                    self._refresh_in_background(
+                        key, self._load_one(load, key), ttl, encode
+                    )
+                    results[key] = value
+                    continue
+
+            missing.append(key)
+
+        if missing:
+            # Not passed to update() directly: its Optional[T] context makes
+            # mypy bind T of the call to Optional[T] and reject ``encode``.
+            loaded = await self._load_many(missing, load, ttl, encode)
+            results.update(loaded)
+
+        return {key: results[key] for key in keys}
+
+    async def invalidate(self, *keys: str) -> None:
+        if keys:
+            await self.cache.delete(*keys)
+
+    async def _load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Optional[T]]],
+        ttl: int,
+        encode: Callable[[T], str | bytes],
+    ) -> Optional[T]:
+        started_at = time.monotonic()
+        value = await load()
+        await self._store(key, value, ttl, encode, time.monotonic() - started_at)
+
+        return value
+
+    async def _load_many(
+        self,
+        keys: list[str],
+        load: Callable[[list[str]], Awaitable[dict[str, Optional[T]]]],
+        ttl: int,
+        encode: Callable[[T], str | bytes],
+    ) -> dict[str, Optional[T]]:
+        started_at = time.monotonic()
+        loaded = await load(keys)
+        delta = time.monotonic() - started_at
+
+        values = {key: loaded.get(key) for key in keys}
+        entries = {
+            key: self._encode_entry(value, ttl, encode, delta)
+            for key, value in values.items()
+            if value is not None
+        }
+        writes = []
+        if entries:
+            writes.append(self.cache.set_many(entries, ttl + self.stale_ttl))
+        if self.negative_ttl > 0 and len(entries) < len(values):
+            tombstones = dict.fromkeys(values.keys() - entries.keys(), TOMBSTONE)
+            writes.append(self.cache.set_many(tombstones, self.negative_ttl))
+        await asyncio.gather(*writes)
+
+        return values
+
+    @staticmethod
+    def _decode(
+        key: str, raw: bytes, decode: Callable[[bytes], T]
+    ) -> Optional[tuple[CacheEntry, T]]:
+        # Values that no longer decode, e.g. written by another version of
+        # the models, are treated as misses and overwritten by the reload
+        try:
+            entry = CacheEntry.decode(raw)
+            return entry, decode(entry.value)
+        except Exception:
+            logger.warning("Failed to decode cached value of %s", key)
+            return None
+
+    @staticmethod
+    def _load_one(
+        load: Callable[[list[str]], Awaitable[dict[str, Optional[T]]]], key: str
+    ) -> Callable[[], Awaitable[Optional[T]]]:
+        async def load_one() -> Optional[T]:
+            return (await load([key])).get(key)
+
+        return load_one
+
+    async def _store(
+        self,
+        key: str,
+        value: Optional[T],
+        ttl: int,
+        encode: Callable[[T], str | bytes],
+        delta: float,
+    ) -> None:
+        if value is None:
+            if self.negative_ttl > 0:
+                await self.cache.set(key, TOMBSTONE, self.negative_ttl)
+            return
+
+        await self.cache.set(
+            key, self._encode_entry(value, ttl, encode, delta), ttl + self.stale_ttl
+        )
+
+    @staticmethod
+    def _encode_entry(
+        value: T, ttl: int, encode: Callable[[T], str | bytes], delta: float
+    ) -> bytes:
+        encoded = encode(value)
+        entry = CacheEntry(
+            value=encoded.encode() if isinstance(encoded, str) else encoded,
+            soft_expires_at=time.time() + ttl,
+            delta=delta,
+        )
+        return entry.encode()
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Optional[T]]],
+        ttl: int,
+        encode: Callable[[T], str | bytes],
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        task = asyncio.create_task(
+            self.single_flight.do(key, lambda: self._load(key, load, ttl, encode))
+        )
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: self._on_refreshed(key, done))
+
+    def _on_refreshed(self, key: str, task: asyncio.Task) -> None:
+        del self._refreshing[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Background refresh of %s failed", key, exc_info=task.exception()
+            )
+
+
+@lru_cache()
+def get_cache_aside() -> CacheAside:
+    return CacheAside(
+        get_cache_service(),
+        get_single_flight(),
+        stale_ttl=(
+            settings.cache_stale_ttl if settings.cache_stale_while_revalidate else 0
+        ),
+        negative_ttl=settings.cache_negative_ttl,
+        early_expiration_beta=(
+            settings.cache_early_expiration_beta
+            if settings.cache_early_expiration
+            else 0.0
+        ),
+    )
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+
+def _always(_: object) -> bool:
+    return True
+
+
+async def load_then_dependent(
+    primary: Awaitable[Optional[T]],
+    dependent: Callable[[T], Awaitable[U]],
+    needs_dependent: Callable[[T], bool] = _always,
+    timeout: Optional[float] = None,
+) -> tuple[Optional[T], Optional[U]]:
+    """Runs a lookup and then the lookup that depends on its result.
+
+    The lookups run one after the other under one deadline. They are not
+    started concurrently on purpose: ``dependent`` is only started when
+    ``primary`` finds a result and ``needs_dependent`` accepts it, otherwise
+    ``None`` is returned in its place. A speculative ``dependent`` could not
+    be stopped anyway, cancelling a caller does not cancel a load shared
+    through ``SingleFlight``.
+
+    Raises:
+        TimeoutError: If both results are not ready within ``timeout``
+    """
+    async with asyncio.timeout(timeout):
+        result = await primary
+        if result is None or not needs_dependent(result):
+            return result, None
+
+        return result, await dependent(result)
@@ -1,27 +1,63 @@
+import asyncio
 import json
+import logging
 from abc import ABC, abstractmethod
-from functools import lru_cache
-from typing import Annotated, Iterable, List, Optional
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import (
+    Annotated,
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
 
+from core.config import settings
 from fastapi import Depends
-from models.film import Film
+from models.film import Film, FilmIdPage, FilmPage, SearchPhase
 
-from .cache import CacheServiceProtocol, get_cache_service
-from .search import SearchServiceABC, get_search_service
+from . import queries
+from .cache_aside import CacheAside, get_cache_aside
+from .generation import NamespaceGenerations, get_namespace_generations
+from .query_text import query_cache_key
+from .rating_index import FilmRatingIndex, get_film_rating_index
+from .search import SearchPage, SearchServiceABC, get_search_service
+from .stats import get_stats_reporter
+from .windows import page_windows
 
-FILM_CACHE_EXPIRE_IN_SECONDS = 60 * 5
+logger = logging.getLogger(__name__)
+
+FILM_CACHE_EXPIRE_IN_SECONDS = 60 * 60 * 3
 FILM_LIST_CACHE_EXPIRE_IN_SECONDS = 60
 
+# List queries only fetch and cache film ids, the films themselves are read
+# from the film:{id} entries, so a film is cached once for every list.
+FILM_ID_FIELDS = ["id"]
+
+# The only order kept in the rating index
+TOP_RATED_SORT = "-imdb_rating"
+
 
 class FilmServiceABC(ABC):
     @abstractmethod
     async def get_by_id(self, film_id: str) -> Optional[Film]:
         pass
 
+    @abstractmethod
+    async def get_many(self, film_ids: Sequence[str]) -> dict[str, Optional[Film]]:
+        pass
+
     @abstractmethod
     async def search_films(
-        self, query: str, page_size: int, page_number: int
-    ) -> List[Film]:
+        self,
+        query: str,
+        page_size: int,
+        page_number: int,
+        cursor: Optional[str] = None,
+    ) -> FilmPage:
         pass
 
     @abstractmethod
@@ -31,7 +67,8 @@ class FilmServiceABC(ABC):
         page_number: int,
         genre_id: Optional[str] = None,
         sort: str = "imdb_rating",
-    ) -> List[Film]:
+        cursor: Optional[str] = None,
+    ) -> FilmPage:
         pass
 
     @abstractmethod
@@ -44,70 +81,151 @@ class FilmServiceABC(ABC):
     ) -> List[Film]:
         pass
 
+    @abstractmethod
+    async def get_films_with_persons(
+        self,
+        person_ids: Sequence[str],
+        page_size: int,
+        page_number: int,
+        sort: str = "imdb_rating",
+    ) -> dict[str, List[Film]]:
+        pass
+
+    @abstractmethod
+    async def invalidate(
+        self, film_ids: Iterable[str], person_ids: Iterable[str] = ()
+    ) -> None:
+        pass
+
+
+@dataclass
+class RatingIndexStats:
+    hits: int = 0
+    fallbacks: int = 0
+
+
+@dataclass
+class SearchPhaseStats:
+    exact: int = 0
+    fuzzy: int = 0
+    fallback_rate: float = 0.0
+
+    def record(self, search_phase: SearchPhase) -> None:
+        if search_phase == SearchPhase.FUZZY:
+            self.fuzzy += 1
+        else:
+            self.exact += 1
+        self.fallback_rate = self.fuzzy / (self.exact + self.fuzzy)
+
 
 class FilmService(FilmServiceABC):
+    """Film lookups over the movies index, cached in Redis.
+
+    Full-text search runs an exact query first and falls back to a fuzzy
+    one only when fewer than ``fuzzy_fallback_min_hits`` films match.
+    Listings are fetched and cached in windows of ``window_size`` films.
+    Films sorted by rating are read from ``rating_index`` when it is built.
+    """
+
     INDEX = "movies"
 
     def __init__(
         self,
-        cache: CacheServiceProtocol,
+        cache: CacheAside,
         search_service: SearchServiceABC,
+        generations: NamespaceGenerations,
+        fuzzy_fallback_min_hits: int,
+        window_size: int = 100,
+        rating_index: Optional[FilmRatingIndex] = None,
     ):
         self.cache = cache
         self.search_service = search_service
+        self.generations = generations
+        self.fuzzy_fallback_min_hits = fuzzy_fallback_min_hits
+        self.window_size = window_size
+        self.rating_index = rating_index
+        self.search_stats = SearchPhaseStats()
+        self.rating_index_stats = RatingIndexStats()
 
     async def get_by_id(self, film_id: str) -> Optional[Film]:
-        cache_key = self._get_film_cache_key(film_id)
-        cached_film = await self.cache.get(cache_key)
-        if cached_film:
-            return Film.model_validate_json(cached_film)
+        async def load() -> Optional[Film]:
+            response = await self.search_service.get(resource=self.INDEX, uuid=film_id)
 
-        response = await self.search_service.get(resource=self.INDEX, uuid=film_id)
+            if response is None:
+                return None
 
-        if response is None:
-            return None
+            return Film(**response)
 
-        film = Film(**response)
-        await self.cache.set(
-            cache_key,
-            film.model_dump_json(),
+        return await self.cache.get_or_load(
+            self._get_film_cache_key(film_id),
+            load,
             FILM_CACHE_EXPIRE_IN_SECONDS,
+            encode=Film.model_dump_json,
+            decode=Film.model_validate_json,
         )
 
-        return film
+    async def get_many(self, film_ids: Sequence[str]) -> dict[str, Optional[Film]]:
+        cache_keys = {
+            self._get_film_cache_key(film_id): film_id for film_id in film_ids
+        }
+
+        async def load(keys: list[str]) -> dict[str, Optional[Film]]:
+            response = await self.search_service.get_many(
+                resource=self.INDEX, uuids=[cache_keys[key] for key in keys]
+            )
+            films = {}
+            for key in keys:
+                film = response.get(cache_keys[key])
+                if film is not None:
+                    films[key] = Film(**film)
+
+            return films
+
+        films = await self.cache.get_many_or_load(
+            list(cache_keys),
+            load,
+            FILM_CACHE_EXPIRE_IN_SECONDS,
+            encode=Film.model_dump_json,
+            decode=Film.model_validate_json,
+        )
+        return {film_id: films[cache_key] for cache_key, film_id in cache_keys.items()}
 
     async def search_films(
         self,
         query: str,
         page_size: int,
         page_number: int,
-    ) -> List[Film]:
-        cache_key = self._get_films_search_cache_key(query, page_size, page_number)
-        cached_films = await self._get_films_from_cache(cache_key)
-        if cached_films:
-            return cached_films
-
-        response = await self.search_service.search_raw_query(
-            resource=self.INDEX,
-            query={
-                "multi_match": {
-                    "query": query,
-                    "fields": [
-                        "title^3",
-                        "description",
-                        "genres_names",
-                        "actors_names",
-                        "directors_names",
-                        "writers_names",
-                    ],
-                    "fuzziness": "AUTO",
-                },
-            },
-            page_size=page_size,
-            page_number=page_number,
+        cursor: Optional[str] = None,
+    ) -> FilmPage:
+        async def load(**page_params: Any) -> FilmIdPage:
+            # The phase depends only on the query, so every page and cursor
+            # of one search is answered by the same phase.
+            page = await self._search_film_ids(
+                query=queries.films_search(query, fuzzy=False),
+                count_hits_up_to=self.fuzzy_fallback_min_hits,
+                **page_params,
+            )
+            if (page.total_hits or 0) >= self.fuzzy_fallback_min_hits:
+                return self._to_id_page(page, SearchPhase.EXACT)
+
+            logger.debug("Falling back to fuzzy search for %r", query)
+            page = await self._search_film_ids(
+                query=queries.films_search(query), **page_params
+            )
+            return self._to_id_page(page, SearchPhase.FUZZY)
+
+        films = await self._get_films_page(
+            self._get_films_search_cache_key(
+                await self.generations.get(self.INDEX), query
+            ),
+            load,
+            page_size,
+            page_number,
+            cursor,
         )
-        films = [Film(**item) for item in response]
-        await self._save_films_to_cache(cache_key, films)
+        if films.search_phase is not None:
+            self.search_stats.record(films.search_phase)
+
         return films
 
     async def list_films(
@@ -116,33 +234,26 @@ class FilmService(FilmServiceABC):
         page_number: int,
         genre_id: Optional[str] = None,
         sort: str = "imdb_rating",
-    ) -> List[Film]:
-        cache_key = self._get_films_list_cache_key(
-            sort, genre_id, page_size, page_number
+        cursor: Optional[str] = None,
+    ) -> FilmPage:
+        load = partial(
+            self._load_film_ids_page,
+            query=queries.films_by_genre(genre_id),
+            sort=sort,
+            request_cache=True,
         )
-        cached_films = await self._get_films_from_cache(cache_key)
-        if cached_films:
-            return cached_films
-
-        response = await self.search_service.search_raw_query(
-            resource=self.INDEX,
-            query=(
-                {"match_all": {}}
-                if genre_id is None
-                else {
-                    "nested": {
-                        "path": "genres",
-                        "query": {"term": {"genres.id": genre_id}},
-                    }
-                }
+        if sort == TOP_RATED_SORT and self.rating_index is not None:
+            load = partial(self._load_top_rated_ids_page, genre_id, load)
+
+        return await self._get_films_page(
+            self._get_films_list_cache_key(
+                await self.generations.get(self.INDEX), sort, genre_id
             ),
-            page_size=page_size,
-            page_number=page_number,
-            sort=sort,
+            load,
+            page_size,
+            page_number,
+            cursor,
         )
-        films = [Film(**item) for item in response]
-        await self._save_films_to_cache(cache_key, films)
-        return films
 
     async def get_films_with_person(
         self,
@@ -151,79 +262,260 @@ class FilmService(FilmServiceABC):
         page_number: int,
         sort: str = "imdb_rating",
     ) -> List[Film]:
-        cache_key = self._get_person_films_cache_key(person_id)
-        cached_films = await self._get_films_from_cache(cache_key)
-        if cached_films:
-            return cached_films
-
-        response = await self.search_service.search_raw_query(
-            resource=self.INDEX,
-            query={
-                "bool": {
-                    "should": [
-                        {
-                            "nested": {
-                                "path": "actors",
-                                "query": {"term": {"actors.id": person_id}},
-                            }
-                        },
-                        {
-                            "nested": {
-                                "path": "directors",
-                                "query": {"term": {"directors.id": person_id}},
-                            }
-                        },
-                        {
-                            "nested": {
-                                "path": "writers",
-                                "query": {"term": {"writers.id": person_id}},
-                            }
-                        },
-                    ]
-                }
-            },
-            page_size=page_size,
-            page_number=page_number,
-            sort=sort,
+        async def load() -> list[str]:
+            response = await self.search_service.search_raw_query(
+                resource=self.INDEX,
+                query=queries.films_with_person(person_id),
+                page_size=page_size,
+                page_number=page_number,
+                sort=sort,
+                source_includes=FILM_ID_FIELDS,
+                request_cache=True,
+            )
+            return [item["id"] for item in response]
+
+        film_ids = await self.cache.get_or_load(
+            self._get_person_films_cache_key(person_id),
+            load,
+            FILM_LIST_CACHE_EXPIRE_IN_SECONDS,
+            encode=json.dumps,
+            decode=json.loads,
         )
-        films = [Film(**item) for item in response]
-        await self._save_films_to_cache(cache_key, films)
-        return films
+        return await self._get_films(film_ids or [])
 
-    def _get_film_cache_key(self, film_id: str) -> str:
-        return f"film:{film_id}"
+    async def get_films_with_persons(
+        self,
+        person_ids: Sequence[str],
+        page_size: int,
+        page_number: int,
+        sort: str = "imdb_rating",
+    ) -> dict[str, List[Film]]:
+        cache_keys = {
+            self._get_person_films_cache_key(person_id): person_id
+            for person_id in person_ids
+        }
 
-    def _get_films_search_cache_key(
-        self, query: str, page_size: int, page_number: int
-    ) -> str:
-        return f"film:search:{query}:{page_size}:{page_number}"
+        async def load(keys: list[str]) -> dict[str, Optional[list[str]]]:
+            responses = await self.search_service.search_raw_queries(
+                resource=self.INDEX,
+                queries=[queries.films_with_person(cache_keys[key]) for key in keys],
+                page_size=page_size,
+                page_number=page_number,
+                sort=sort,
+                source_includes=FILM_ID_FIELDS,
+                request_cache=True,
+            )
+            return {
+                key: [item["id"] for item in response]
+                for key, response in zip(keys, responses)
+            }
 
-    def _get_films_list_cache_key(
-        self, sort: str, genre_id: Optional[str], page_size: int, page_number: int
-    ) -> str:
-        return f"films:list:{sort}:{genre_id}:{page_size}:{page_number}"
+        film_ids = await self.cache.get_many_or_load(
+            list(cache_keys),
+            load,
+            FILM_LIST_CACHE_EXPIRE_IN_SECONDS,
+            encode=json.dumps,
+            decode=json.loads,
+        )
+        films = await self.get_many(
+            [film_id for ids in film_ids.values() for film_id in ids or []]
+        )
+        return {
+            person_id: [
+                films[film_id]
+                for film_id in film_ids[cache_key] or []
+                if films[film_id] is not None
+            ]
+            for cache_key, person_id in cache_keys.items()
+        }
 
-    def _get_person_films_cache_key(self, person_id: str) -> str:
-        return f"person:{person_id}:roles"
+    async def _get_films(self, film_ids: Sequence[str]) -> list[Film]:
+        films = await self.get_many(film_ids)
+        return [films[film_id] for film_id in film_ids if films[film_id] is not None]
 
-    async def _save_films_to_cache(self, cache_key: str, films: Iterable[Film]) -> None:
-        await self.cache.set(
-            cache_key,
-            json.dumps([f.model_dump(mode="json") for f in films]),
+    async def _get_films_page(
+        self,
+        cache_key: str,
+        load: Callable[..., Awaitable[FilmIdPage]],
+        page_size: int,
+        page_number: int,
+        cursor: Optional[str],
+    ) -> FilmPage:
+        """Assemble a page of a film listing cached under ``cache_key``.
+
+        Offset pages are cut from aligned windows of ``window_size`` films, so
+        every page size shares them. Cursor pages are cached on their own.
+        ``load`` gets the ``page_size``, ``page_number`` and ``cursor`` to
+        fetch.
+        """
+        if cursor is None:
+            page = await self._get_films_window_page(
+                cache_key, load, page_size, page_number
+            )
+        else:
+            page = await self.cache.get_or_load(
+                f"{cache_key}:{page_size}:{query_cache_key(cursor)}",
+                partial(
+                    load, page_size=page_size, page_number=page_number, cursor=cursor
+                ),
+                FILM_LIST_CACHE_EXPIRE_IN_SECONDS,
+                encode=partial(FilmIdPage.model_dump_json, exclude={"item_cursors"}),
+                decode=FilmIdPage.model_validate_json,
+            )
+
+        if page is None:
+            return FilmPage(items=[])
+
+        return FilmPage(
+            items=await self._get_films(page.ids),
+            next_cursor=page.next_cursor,
+            search_phase=page.search_phase,
+        )
+
+    async def _get_films_window_page(
+        self,
+        cache_key: str,
+        load: Callable[..., Awaitable[FilmIdPage]],
+        page_size: int,
+        page_number: int,
+    ) -> FilmIdPage:
+        windows, page_slice = page_windows(page_size, page_number, self.window_size)
+        window_keys = {
+            f"{cache_key}:window:{self.window_size}:{window}": window
+            for window in windows
+        }
+
+        async def load_windows(keys: list[str]) -> dict[str, Optional[FilmIdPage]]:
+            pages = await asyncio.gather(
+                *(
+                    load(
+                        page_size=self.window_size,
+                        page_number=window_keys[key] + 1,
+                        cursor=None,
+                    )
+                    for key in keys
+                )
+            )
+            return dict(zip(keys, pages))
+
+        cached = await self.cache.get_many_or_load(
+            list(window_keys),
+            load_windows,
             FILM_LIST_CACHE_EXPIRE_IN_SECONDS,
+            encode=FilmIdPage.model_dump_json,
+            decode=FilmIdPage.model_validate_json,
         )
 
-    async def _get_films_from_cache(self, cache_key: str) -> Optional[List[Film]]:
-        cached_films = await self.cache.get(cache_key)
-        if cached_films:
-            return [Film.model_validate(item) for item in json.loads(cached_films)]
+        ids: list[str] = []
+        item_cursors: list[str] = []
+        search_phase = None
+        for window in cached.values():
+            if window is None:
+                break
+
+            ids += window.ids
+            item_cursors += window.item_cursors
+            search_phase = search_phase or window.search_phase
 
-        return None
+        ids, item_cursors = ids[page_slice], item_cursors[page_slice]
+        return FilmIdPage(
+            ids=ids,
+            next_cursor=item_cursors[-1] if len(ids) == page_size else None,
+            search_phase=search_phase,
+        )
+
+    async def _load_top_rated_ids_page(
+        self,
+        genre_id: Optional[str],
+        fallback: Callable[..., Awaitable[FilmIdPage]],
+        page_size: int,
+        page_number: int,
+        cursor: Optional[str],
+    ) -> FilmIdPage:
+        """Load a page of films by rating from the rating index.
+
+        Cursor pages, pages requested before the ETL has built the index and
+        pages with films without a rating go to ``fallback``: cursors to
+        those films hold the sort value Elasticsearch uses for missing ones.
+        """
+        if cursor is None and self.rating_index is not None:
+            films = await self.rating_index.get_range(
+                genre_id, (page_number - 1) * page_size, page_size
+            )
+            if films is not None and all(rating is not None for _, rating in films):
+                self.rating_index_stats.hits += 1
+                item_cursors = [
+                    self.search_service.encode_cursor([rating, film_id])
+                    for film_id, rating in films
+                ]
+                return FilmIdPage(
+                    ids=[film_id for film_id, _ in films],
+                    next_cursor=item_cursors[-1] if len(films) == page_size else None,
+                    item_cursors=item_cursors,
+                )
+
+        self.rating_index_stats.fallbacks += 1
+        return await fallback(
+            page_size=page_size, page_number=page_number, cursor=cursor
+        )
+
+    async def _load_film_ids_page(self, **search_params: Any) -> FilmIdPage:
+        return self._to_id_page(await self._search_film_ids(**search_params))
+
+    async def _search_film_ids(self, **search_params: Any) -> SearchPage:
+        return await self.search_service.search_page(
+            resource=self.INDEX, source_includes=FILM_ID_FIELDS, **search_params
+        )
+
+    @staticmethod
+    def _to_id_page(
+        page: SearchPage, search_phase: Optional[SearchPhase] = None
+    ) -> FilmIdPage:
+        return FilmIdPage(
+            ids=[item["id"] for item in page.items],
+            next_cursor=page.next_cursor,
+            search_phase=search_phase,
+            item_cursors=page.item_cursors,
+        )
+
+    async def invalidate(
+        self, film_ids: Iterable[str], person_ids: Iterable[str] = ()
+    ) -> None:
+        await self.cache.invalidate(
+            *(self._get_film_cache_key(film_id) for film_id in film_ids),
+            *(self._get_person_films_cache_key(person_id) for person_id in person_ids),
+        )
+
+    def _get_film_cache_key(self, film_id: str) -> str:
+        return f"film:{film_id}"
+
+    def _get_films_search_cache_key(self, generation: int, query: str) -> str:
+        return f"film:search:ids:{generation}:{query_cache_key(query)}"
+
+    def _get_films_list_cache_key(
+        self, generation: int, sort: str, genre_id: Optional[str]
+    ) -> str:
+        return f"films:list:ids:{generation}:{sort}:{genre_id}"
+
+    def _get_person_films_cache_key(self, person_id: str) -> str:
+        return f"person:{person_id}:film_ids"
 
 
 @lru_cache()
 def get_film_service(
-    cache_service: Annotated[CacheServiceProtocol, Depends(get_cache_service)],
+    cache: Annotated[CacheAside, Depends(get_cache_aside)],
     search_service: Annotated[SearchServiceABC, Depends(get_search_service)],
+    generations: Annotated[NamespaceGenerations, Depends(get_namespace_generations)],
+    rating_index: Annotated[Optional[FilmRatingIndex], Depends(get_film_rating_index)],
 ) -> FilmServiceABC:
-    return FilmService(cache_service, search_service)
+    film_service = FilmService(
+        cache,
+        search_service,
+        generations,
+        fuzzy_fallback_min_hits=settings.search_fuzzy_fallback_min_hits,
+        window_size=settings.list_cache_window_size,
+        rating_index=rating_index,
+    )
+    get_stats_reporter().register("film_search_phase", film_service.search_stats)
+    get_stats_reporter().register("film_rating_index", film_service.rating_index_stats)
+    return film_service
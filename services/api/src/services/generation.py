@@ -0,0 +1,49 @@
+import time
+from functools import lru_cache
+
+from core.config import settings
+from db.redis import get_redis
+from redis.asyncio import Redis
+
+GENERATION_KEY = "cache:generation:{namespace}"
+
+
+class NamespaceGenerations:
+    """Generation counters of cache namespaces (one per search index).
+
+    The current generation is part of every list and search cache key built
+    for a namespace, so a single INCR makes all of those keys unreachable.
+    Generations are memoized in-process for ``memo_ttl`` seconds to avoid an
+    extra round-trip per request.
+    """
+
+    def __init__(self, redis: Redis, memo_ttl: float):
+        self.redis = redis
+        self.memo_ttl = memo_ttl
+        self._memo: dict[str, tuple[float, int]] = {}
+
+    async def get(self, namespace: str) -> int:
+        memoized = self._memo.get(namespace)
+        if memoized is not None and memoized[0] > time.monotonic():
+            return memoized[1]
+
+        value = await self.redis.get(GENERATION_KEY.format(namespace=namespace))
+        generation = int(value or 0)
+        self._memo[namespace] = (time.monotonic() + self.memo_ttl, generation)
+
+        return generation
+
+    async def bump(self, namespace: str) -> int:
+        self.forget(namespace)
+        return await self.redis.incr(GENERATION_KEY.format(namespace=namespace))
+
+    def forget(self, namespace: str) -> None:
+        self._memo.pop(namespace, None)
+
+    def forget_all(self) -> None:
+        self._memo.clear()
+
+
+@lru_cache()
+def get_namespace_generations() -> NamespaceGenerations:
+    return NamespaceGenerations(get_redis(), settings.cache_generation_memo_ttl)
@@ -1,15 +1,20 @@
+import asyncio
 import json
 from abc import ABC, abstractmethod
 from functools import lru_cache
-from typing import Annotated, List, Optional
+from typing import Annotated, Iterable, List, Optional
 
+from core.config import settings
 from fastapi import Depends
 from models.genre import Genre
 
-from .cache import CacheServiceProtocol, get_cache_service
+from .cache_aside import CacheAside, get_cache_aside
+from .generation import NamespaceGenerations, get_namespace_generations
+from .genre_catalog import GenreCatalog, GenreCatalogSnapshot, get_genre_catalog
 from .search import SearchServiceABC, get_search_service
+from .windows import page_windows
 
-GENRE_CACHE_EXPIRE_IN_SECONDS = 60 * 5
+GENRE_CACHE_EXPIRE_IN_SECONDS = 60 * 60 * 3
 GENRE_LIST_CACHE_EXPIRE_IN_SECONDS = 60
 
 
@@ -24,77 +29,131 @@ class GenreServiceABC(ABC):
         """List genres with pagination."""
         ...
 
+    @abstractmethod
+    async def invalidate(self, genre_ids: Iterable[str]) -> None:
+        """Drop cached genres with the given IDs."""
+        ...
+
 
 class GenreService(GenreServiceABC):
+    """Genres from the in-memory catalog, or from the cache until it loads."""
+
     INDEX = "genres"
 
-    def __init__(self, cache: CacheServiceProtocol, search_service: SearchServiceABC):
+    def __init__(
+        self,
+        cache: CacheAside,
+        search_service: SearchServiceABC,
+        generations: NamespaceGenerations,
+        window_size: int = 100,
+        catalog: Optional[GenreCatalog] = None,
+    ):
         self.cache = cache
         self.search_service = search_service
+        self.generations = generations
+        self.window_size = window_size
+        self.catalog = catalog
 
     async def get_by_id(self, genre_id: str) -> Optional[Genre]:
-        cache_key = self._get_genre_cache_key(genre_id)
-        cached_genre = await self.cache.get(cache_key)
-        if cached_genre:
-            return Genre.model_validate_json(cached_genre)
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return snapshot.by_id.get(genre_id)
+
+        async def load() -> Optional[Genre]:
+            response = await self.search_service.get(resource=self.INDEX, uuid=genre_id)
 
-        response = await self.search_service.get(resource=self.INDEX, uuid=genre_id)
+            if response is None:
+                return None
 
-        if response is None:
-            return None
+            return Genre(**response)
 
-        genre = Genre(**response)
-        await self.cache.set(
-            cache_key,
-            genre.model_dump_json(),
+        return await self.cache.get_or_load(
+            self._get_genre_cache_key(genre_id),
+            load,
             GENRE_CACHE_EXPIRE_IN_SECONDS,
+            encode=Genre.model_dump_json,
+            decode=Genre.model_validate_json,
         )
 
-        return genre
-
     async def list_genres(
         self,
         page_size,
         page_number,
     ) -> List[Genre]:
-        cache_key = self._get_genres_list_cache_key(page_size, page_number)
-        cached_genres = await self._get_genres_from_cache(cache_key)
-        if cached_genres:
-            return cached_genres
-
-        response = await self.search_service.get_list(
-            resource=self.INDEX, page_size=page_size, page_number=page_number
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            page = slice((page_number - 1) * page_size, page_number * page_size)
+            return list(snapshot.genres[page])
+
+        windows, page_slice = page_windows(page_size, page_number, self.window_size)
+        generation = await self.generations.get(self.INDEX)
+        window_keys = {
+            self._get_genres_window_cache_key(generation, window): window
+            for window in windows
+        }
+
+        async def load(keys: list[str]) -> dict[str, Optional[List[Genre]]]:
+            responses = await asyncio.gather(
+                *(
+                    self.search_service.get_list(
+                        resource=self.INDEX,
+                        page_size=self.window_size,
+                        page_number=window_keys[key] + 1,
+                    )
+                    for key in keys
+                )
+            )
+            return {
+                key: [Genre(**item) for item in response]
+                for key, response in zip(keys, responses)
+            }
+
+        cached = await self.cache.get_many_or_load(
+            list(window_keys),
+            load,
+            GENRE_LIST_CACHE_EXPIRE_IN_SECONDS,
+            encode=self._encode_genres,
+            decode=self._decode_genres,
         )
+        genres = [genre for window in cached.values() for genre in window or []]
+        return genres[page_slice]
 
-        genres = [Genre(**item) for item in response]
-        await self._save_genres_to_cache(cache_key, genres)
+    async def invalidate(self, genre_ids: Iterable[str]) -> None:
+        await self.cache.invalidate(
+            *(self._get_genre_cache_key(genre_id) for genre_id in genre_ids)
+        )
+        if self.catalog is not None:
+            await self.catalog.refresh()
 
-        return genres
+    def _get_snapshot(self) -> Optional[GenreCatalogSnapshot]:
+        return self.catalog.snapshot if self.catalog is not None else None
 
     def _get_genre_cache_key(self, genre_id: str) -> str:
         return f"genre:{genre_id}"
 
-    def _get_genres_list_cache_key(self, page_size: int, page_number: int) -> str:
-        return f"genres:list:{page_size}:{page_number}"
-
-    async def _save_genres_to_cache(self, cache_key: str, genres: List[Genre]) -> None:
-        await self.cache.set(
-            cache_key,
-            json.dumps([f.model_dump(mode="json") for f in genres]),
-            GENRE_LIST_CACHE_EXPIRE_IN_SECONDS,
-        )
+    def _get_genres_window_cache_key(self, generation: int, window: int) -> str:
+        return f"genres:list:{generation}:window:{self.window_size}:{window}"
 
-    async def _get_genres_from_cache(self, cache_key: str) -> Optional[List[Genre]]:
-        cached_genres = await self.cache.get(cache_key)
-        if cached_genres:
-            return [Genre.model_validate(item) for item in json.loads(cached_genres)]
+    @staticmethod
+    def _encode_genres(genres: List[Genre]) -> str:
+        return json.dumps([f.model_dump(mode="json") for f in genres])
 
-        return None
+    @staticmethod
+    def _decode_genres(cached_genres: bytes) -> List[Genre]:
+        return [Genre.model_validate(item) for item in json.loads(cached_genres)]
 
 
 @lru_cache()
 def get_genre_service(
-    cache_service: Annotated[CacheServiceProtocol, Depends(get_cache_service)],
+    cache: Annotated[CacheAside, Depends(get_cache_aside)],
     search_service: Annotated[SearchServiceABC, Depends(get_search_service)],
+    generations: Annotated[NamespaceGenerations, Depends(get_namespace_generations)],
+    catalog: Annotated[Optional[GenreCatalog], Depends(get_genre_catalog)],
 ) -> GenreServiceABC:
-    return GenreService(cache_service, search_service)
+    return GenreService(
+        cache,
+        search_service,
+        generations,
+        window_size=settings.list_cache_window_size,
+        catalog=catalog,
+    )
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from core.config import settings
+from models.genre import Genre
+
+from .search import SearchServiceABC, get_search_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GenreCatalogSnapshot:
+    genres: tuple[Genre, ...]
+    by_id: Mapping[str, Genre]
+
+    @classmethod
+    def build(cls, genres: list[Genre]) -> "GenreCatalogSnapshot":
+        return cls(
+            genres=tuple(genres),
+            by_id=MappingProxyType({str(genre.id): genre for genre in genres}),
+        )
+
+
+class GenreCatalog:
+    """The whole genre index held in process memory.
+
+    A refresh loads every genre with one search request and replaces the
+    snapshot in a single assignment, so readers always see a complete
+    catalog. A failed refresh keeps the previous snapshot. Refreshes are
+    numbered when they start and one that finishes after a later-started
+    refresh is discarded, so a slow timer refresh cannot replace the
+    snapshot loaded for a newer change notification. Until the first
+    successful load ``snapshot`` is None and genres are served from the
+    cache. Catalogs larger than ``max_size`` are never loaded.
+    """
+
+    INDEX = "genres"
+
+    def __init__(
+        self, search_service: SearchServiceABC, max_size: int, refresh_interval: float
+    ):
+        self.search_service = search_service
+        self.max_size = max_size
+        self.refresh_interval = refresh_interval
+        self.snapshot: Optional[GenreCatalogSnapshot] = None
+        self._started = 0
+        self._applied = 0
+
+    async def refresh(self) -> None:
+        self._started += 1
+        sequence = self._started
+        try:
+            response = await self.search_service.get_list(
+                resource=self.INDEX, page_size=self.max_size + 1, page_number=1
+            )
+        except Exception:
+            logger.exception("Failed to refresh the genre catalog")
+            return
+
+        if sequence < self._applied:
+            logger.debug("Discarding an outdated genre catalog refresh")
+            return
+
+        self._applied = sequence
+        if len(response) > self.max_size:
+            logger.warning(
+                "Genre catalog exceeds %s genres, it is not kept in memory",
+                self.max_size,
+            )
+            self.snapshot = None
+            return
+
+        self.snapshot = GenreCatalogSnapshot.build([Genre(**item) for item in response])
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+
+@lru_cache()
+def get_genre_catalog() -> Optional[GenreCatalog]:
+    if not settings.genre_catalog_enabled:
+        return None
+
+    return GenreCatalog(
+        get_search_service(),
+        max_size=settings.genre_catalog_max_size,
+        refresh_interval=settings.genre_catalog_refresh_interval,
+    )
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+import backoff
+from core.config import settings
+from db.redis import get_redis
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from .cache import LocalLRUCache, TwoTierCacheService, get_cache_service
+from .cache_aside import get_cache_aside
+from .film import FilmServiceABC, get_film_service
+from .generation import NamespaceGenerations, get_namespace_generations
+from .genre import GenreServiceABC, get_genre_service
+from .genre_catalog import get_genre_catalog
+from .person import PersonService, get_person_service
+from .rating_index import get_film_rating_index
+from .search import get_search_service
+from .warmup import CacheWarmer, get_cache_warmer
+
+logger = logging.getLogger(__name__)
+
+
+class CacheInvalidationSubscriber:
+    """Evicts cached entities that were changed by the ETL from this process.
+
+    The ETL publishes ``{"index": ..., "ids": [...], "person_ids": [...]}``
+    on ``channel`` after every bulk load into Elasticsearch, in the same
+    transaction that bumps the generation of that index and deletes the
+    changed entities from Redis. Pub/Sub drops messages while nobody is
+    subscribed, so the messages only matter for in-process state: the local
+    cache tier and the memoized generations are flushed on every (re)subscribe.
+    Once a batch of changes is loaded the ETL publishes
+    ``{"event": "etl_cycle_completed"}``, which triggers a cache warm-up.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        channel: str,
+        film_service: FilmServiceABC,
+        genre_service: GenreServiceABC,
+        person_service: PersonService,
+        generations: NamespaceGenerations,
+        warmer: Optional[CacheWarmer] = None,
+        local_cache: Optional[LocalLRUCache] = None,
+    ):
+        self.redis = redis
+        self.channel = channel
+        self.film_service = film_service
+        self.genre_service = genre_service
+        self.person_service = person_service
+        self.generations = generations
+        self.warmer = warmer
+        self.local_cache = local_cache
+        self._warm_up_task: Optional[asyncio.Task] = None
+
+    @backoff.on_exception(backoff.expo, RedisConnectionError, max_value=30)
+    async def run(self) -> None:
+        async with self.redis.pubsub() as pubsub:
+            await pubsub.subscribe(self.channel)
+            self._forget_local_state()
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                try:
+                    await self.handle(message["data"])
+                except Exception:
+                    logger.exception("Failed to handle cache invalidation message")
+
+    async def handle(self, data: bytes) -> None:
+        event = json.loads(data)
+        if event.get("event") == "etl_cycle_completed":
+            self._warm_up()
+            return
+
+        index, ids = event["index"], event.get("ids", [])
+        self.generations.forget(index)
+
+        if index == "movies":
+            await self.film_service.invalidate(ids, event.get("person_ids", []))
+        elif index == "genres":
+            await self.genre_service.invalidate(ids)
+        elif index == "persons":
+            await self.person_service.invalidate(ids)
+
+    def _forget_local_state(self) -> None:
+        # Messages published before the subscription are lost
+        self.generations.forget_all()
+        if self.local_cache is not None:
+            self.local_cache.clear()
+
+    def _warm_up(self) -> None:
+        if self.warmer is None:
+            return
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            return
+
+        self._warm_up_task = asyncio.create_task(self.warmer.warm_up())
+
+
+def get_cache_invalidation_subscriber() -> CacheInvalidationSubscriber:
+    cache = get_cache_aside()
+    search_service = get_search_service()
+    generations = get_namespace_generations()
+    cache_service = get_cache_service()
+
+    return CacheInvalidationSubscriber(
+        get_redis(),
+        settings.cache_invalidation_channel,
+        film_service=get_film_service(
+            cache=cache,
+            search_service=search_service,
+            generations=generations,
+            rating_index=get_film_rating_index(),
+        ),
+        genre_service=get_genre_service(
+            cache=cache,
+            search_service=search_service,
+            generations=generations,
+            catalog=get_genre_catalog(),
+        ),
+        person_service=get_person_service(
+            cache=cache, search_service=search_service, generations=generations
+        ),
+        generations=generations,
+        warmer=get_cache_warmer() if settings.cache_warmup_enabled else None,
+        local_cache=(
+            cache_service.local
+            if isinstance(cache_service, TwoTierCacheService)
+            else None
+        ),
+    )
@@ -1,81 +1,105 @@
 import json
 from functools import lru_cache
-from typing import Annotated, Optional
+from typing import Annotated, Iterable, Optional
 
 from fastapi import Depends
-from models.person import Person
+from models.person import PersonDetails
 
-from .cache import CacheServiceProtocol, get_cache_service
+from .cache_aside import CacheAside, get_cache_aside
+from .generation import NamespaceGenerations, get_namespace_generations
+from .query_text import query_cache_key
 from .search import SearchServiceABC, get_search_service
 
-PERSON_CACHE_EXPIRE_IN_SECONDS = 60 * 5
+PERSON_CACHE_EXPIRE_IN_SECONDS = 60 * 60 * 3
 PERSON_LIST_CACHE_EXPIRE_IN_SECONDS = 60
 
 
 class PersonService:
     INDEX = "persons"
 
-    def __init__(self, cache: CacheServiceProtocol, storage: SearchServiceABC):
+    def __init__(
+        self,
+        cache: CacheAside,
+        storage: SearchServiceABC,
+        generations: NamespaceGenerations,
+    ):
         self.cache = cache
         self.storage = storage
+        self.generations = generations
 
-    async def get_by_id(self, person_id: str) -> Optional[Person]:
-        cache_key = self._get_person_cache_key(person_id)
-        cached_person = await self.cache.get(cache_key)
-        if cached_person:
-            return Person.model_validate_json(cached_person)
+    async def get_by_id(self, person_id: str) -> Optional[PersonDetails]:
+        async def load() -> Optional[PersonDetails]:
+            response = await self.storage.get(resource=self.INDEX, uuid=person_id)
 
-        response = await self.storage.get(resource=self.INDEX, uuid=person_id)
+            if response is None:
+                return None
 
-        if response is None:
-            return None
+            return PersonDetails(**response)
 
-        person = Person(**response)
-        await self.cache.set(
-            cache_key,
-            person.model_dump_json(),
+        return await self.cache.get_or_load(
+            self._get_person_cache_key(person_id),
+            load,
             PERSON_CACHE_EXPIRE_IN_SECONDS,
+            encode=PersonDetails.model_dump_json,
+            decode=PersonDetails.model_validate_json,
         )
 
-        return person
-
     async def search_by_name(
         self, name: str, page_size: int, page_number: int
-    ) -> list[Person]:
-        cache_key = self._get_persons_search_cache_key(name, page_size, page_number)
-        cached_persons = await self.cache.get(cache_key)
-        if cached_persons:
-            return [Person.model_validate_json(p) for p in json.loads(cached_persons)]
-
-        response = await self.storage.search_by_field(
-            resource=self.INDEX,
-            field="name",
-            query=name,
-            page_size=page_size,
-            page_number=page_number,
-        )
-
-        persons = [Person(**item) for item in response]
-        await self.cache.set(
-            cache_key,
-            json.dumps([p.model_dump_json() for p in persons]),
+    ) -> list[PersonDetails]:
+        async def load() -> list[PersonDetails]:
+            response = await self.storage.search_by_field(
+                resource=self.INDEX,
+                field="name",
+                query=name,
+                page_size=page_size,
+                page_number=page_number,
+            )
+
+            return [PersonDetails(**item) for item in response]
+
+        persons = await self.cache.get_or_load(
+            self._get_persons_search_cache_key(
+                await self.generations.get(self.INDEX), name, page_size, page_number
+            ),
+            load,
             PERSON_LIST_CACHE_EXPIRE_IN_SECONDS,
+            encode=self._encode_persons,
+            decode=self._decode_persons,
         )
+        return persons or []
 
-        return persons
+    async def invalidate(self, person_ids: Iterable[str]) -> None:
+        await self.cache.invalidate(
+            *(self._get_person_cache_key(person_id) for person_id in person_ids)
+        )
 
     def _get_person_cache_key(self, person_id: str) -> str:
         return f"person:{person_id}"
 
     def _get_persons_search_cache_key(
-        self, name: str, page_size: int, page_number: int
+        self, generation: int, name: str, page_size: int, page_number: int
     ) -> str:
-        return f"persons:search:{name}:{page_size}:{page_number}"
+        return (
+            f"persons:search:{generation}:{query_cache_key(name)}:{page_size}"
+            f":{page_number}"
+        )
+
+    @staticmethod
+    def _encode_persons(persons: list[PersonDetails]) -> str:
+        return json.dumps([p.model_dump_json() for p in persons])
+
+    @staticmethod
+    def _decode_persons(cached_persons: bytes) -> list[PersonDetails]:
+        return [
+            PersonDetails.model_validate_json(p) for p in json.loads(cached_persons)
+        ]
 
 
 @lru_cache()
 def get_person_service(
-    cache_service: Annotated[CacheServiceProtocol, Depends(get_cache_service)],
+    cache: Annotated[CacheAside, Depends(get_cache_aside)],
     search_service: Annotated[SearchServiceABC, Depends(get_search_service)],
+    generations: Annotated[NamespaceGenerations, Depends(get_namespace_generations)],
 ) -> PersonService:
-    return PersonService(cache_service, search_service)
+    return PersonService(cache, search_service, generations)
@@ -0,0 +1,65 @@
+from typing import Any, Iterable, Optional
+
+Query = dict[str, Any]
+
+# search_text is filled by copy_to from the title, description, genre and
+# person names. The title is also queried on its own to keep it boosted.
+FILM_SEARCH_FIELDS = ("title^3", "search_text")
+FILM_CREDIT_PATHS = ("actors", "directors", "writers")
+
+
+def match_all() -> Query:
+    return {"match_all": {}}
+
+
+def nested_term(path: str, field: str, value: str) -> Query:
+    return {"nested": {"path": path, "query": {"term": {f"{path}.{field}": value}}}}
+
+
+def any_of(queries: Iterable[Query]) -> Query:
+    return {"bool": {"should": list(queries), "minimum_should_match": 1}}
+
+
+def filtered(*filters: Query) -> Query:
+    """Matches documents passing every filter, without scoring them.
+
+    Filters run in the filter context: they do not compute scores and
+    Elasticsearch caches them as bitsets between requests.
+    """
+    if not filters:
+        return match_all()
+
+    return {"bool": {"filter": list(filters)}}
+
+
+def full_text(query: str, fields: Iterable[str], fuzzy: bool = True) -> Query:
+    """Matches ``query`` in any of ``fields``.
+
+    The exact variant requires every term to match, so one misspelled word
+    in a longer query leaves too few hits and the caller falls back to the
+    fuzzy variant, which matches any term within the edit distance.
+    """
+    multi_match: Query = {"query": query, "fields": list(fields)}
+    if fuzzy:
+        multi_match["fuzziness"] = "AUTO"
+    else:
+        multi_match["operator"] = "and"
+
+    return {"multi_match": multi_match}
+
+
+def films_by_genre(genre_id: Optional[str]) -> Query:
+    if genre_id is None:
+        return match_all()
+
+    return filtered(nested_term("genres", "id", genre_id))
+
+
+def films_with_person(person_id: str) -> Query:
+    return filtered(
+        any_of(nested_term(path, "id", person_id) for path in FILM_CREDIT_PATHS)
+    )
+
+
+def films_search(query: str, fuzzy: bool = True) -> Query:
+    return full_text(query, FILM_SEARCH_FIELDS, fuzzy=fuzzy)
@@ -0,0 +1,49 @@
+import hashlib
+import unicodedata
+
+# Queries and cursors up to this length are kept verbatim in cache keys
+MAX_QUERY_KEY_LENGTH = 64
+
+# The _english_ and _russian_ stop lists of the ru_en analyzer
+ENGLISH_STOPWORDS = frozenset(
+    "a an and are as at be but by for if in into is it no not of on or such "
+    "that the their then there these they this to was will with".split()
+)
+RUSSIAN_STOPWORDS = frozenset(
+    "и в во не что он на я с со как а то все она так его но да ты к у же вы "
+    "за бы по только ее мне было вот от меня еще нет о из ему теперь когда "
+    "даже ну вдруг ли если уже или ни быть был него до вас нибудь опять уж "
+    "вам ведь там потом себя ничего ей может они тут где есть надо ней для "
+    "мы тебя их чем была сам чтоб без будто чего раз тоже себе под будет ж "
+    "тогда кто этот того потому этого какой совсем ним здесь этом один почти "
+    "мой тем чтобы нее сейчас были куда зачем всех никогда можно при наконец "
+    "два об другой хоть после над больше тот через эти нас про всего них "
+    "какая много разве три эту моя впрочем хорошо свою этой перед иногда "
+    "лучше чуть том нельзя такой им более всегда конечно всю между".split()
+)
+STOPWORDS = ENGLISH_STOPWORDS | RUSSIAN_STOPWORDS
+
+
+def normalize_query(query: str, strip_stopwords: bool = False) -> str:
+    """Canonical form of a search query.
+
+    Applies Unicode NFKC, case folding and whitespace collapsing, so queries
+    differing only in case or spacing share cache entries. Stopwords are
+    dropped on request unless the query consists of stopwords only.
+    """
+    words = unicodedata.normalize("NFKC", query).casefold().split()
+    if strip_stopwords:
+        words = [word for word in words if word not in STOPWORDS] or words
+
+    return " ".join(words)
+
+
+def query_cache_key(query: str) -> str:
+    """Cache key part for client-supplied text such as a query or a cursor.
+
+    Text longer than ``MAX_QUERY_KEY_LENGTH`` is replaced by its hash.
+    """
+    if len(query) <= MAX_QUERY_KEY_LENGTH:
+        return query
+
+    return "sha256-" + hashlib.sha256(query.encode()).hexdigest()
@@ -0,0 +1,58 @@
+import math
+from functools import lru_cache
+from typing import Optional
+
+from core.config import settings
+from db.redis import get_redis
+from redis.asyncio import Redis
+
+READY_KEY = "films:by_rating:ready"
+ALL_FILMS_KEY = "films:by_rating:all"
+GENRE_FILMS_KEY = "films:by_rating:genre:{genre_id}"
+
+
+class FilmRatingIndex:
+    """Films ordered by rating, kept in Redis sorted sets by the ETL.
+
+    There is a set of all films and a set per genre. Scores are negated
+    ratings, so ZRANGE returns films in the order of the ``-imdb_rating``
+    search: rating descending, ties by id. Films without a rating score
+    +inf and come last, as in Elasticsearch. The ETL sets the ready marker
+    once the sets are complete.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def get_range(
+        self, genre_id: Optional[str], start: int, count: int
+    ) -> Optional[list[tuple[str, Optional[float]]]]:
+        """Ids and ratings of up to ``count`` films from position ``start``.
+
+        Returns None while the sets are not built.
+        """
+        key = (
+            ALL_FILMS_KEY
+            if genre_id is None
+            else GENRE_FILMS_KEY.format(genre_id=genre_id)
+        )
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.exists(READY_KEY)
+            pipe.zrange(key, start, start + count - 1, withscores=True)
+            ready, films = await pipe.execute()
+
+        if not ready:
+            return None
+
+        return [
+            (film_id.decode(), None if math.isinf(score) else -score)
+            for film_id, score in films
+        ]
+
+
+@lru_cache()
+def get_film_rating_index() -> Optional[FilmRatingIndex]:
+    if not settings.film_rating_index_enabled:
+        return None
+
+    return FilmRatingIndex(get_redis())
@@ -0,0 +1,134 @@
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Annotated, Any, Awaitable, Callable, Iterable
+
+from core.config import settings
+from fastapi import Depends, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+from .cache_aside import CacheAside, get_cache_aside
+from .generation import NamespaceGenerations, get_namespace_generations
+
+# Headers that are derived from the body when the response is rendered again
+RENDERED_HEADERS = frozenset({"content-length", "content-type"})
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    media_type: str
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "CachedResponse":
+        meta, _, body = raw.partition(b"\n")
+        if not meta.startswith(b"{"):
+            # Responses cached before headers were stored start with
+            # the media type.
+            return cls(body=body, media_type=meta.decode())
+
+        meta_fields = json.loads(meta)
+        return cls(
+            body=body,
+            media_type=meta_fields["media_type"],
+            headers=meta_fields["headers"],
+        )
+
+    def encode(self) -> bytes:
+        meta = json.dumps({"media_type": self.media_type, "headers": self.headers})
+        return meta.encode() + b"\n" + self.body
+
+
+class ResponseCache:
+    """Caches final serialized responses of the API endpoints.
+
+    Hits are returned as raw bytes, without validating or serializing any
+    pydantic model. ``build`` may return a ready ``Response`` when it needs
+    to set headers, they are cached along with the body. Keys include the
+    generations of the given namespaces, so an ETL load into an index drops
+    every response built from it. Responses that are cheaper to build than
+    to fetch are passed as not ``cacheable``.
+    """
+
+    KEY_PREFIX = "response"
+
+    def __init__(
+        self,
+        cache: CacheAside,
+        generations: NamespaceGenerations,
+        ttl: int,
+        enabled: bool = True,
+    ):
+        self.cache = cache
+        self.generations = generations
+        self.ttl = ttl
+        self.enabled = enabled
+
+    async def respond(
+        self,
+        key_parts: Iterable[Any],
+        build: Callable[[], Awaitable[Any]],
+        namespaces: Iterable[str],
+        cacheable: bool = True,
+    ) -> Response:
+        if not self.enabled or not cacheable:
+            return self._render(await build())
+
+        async def render() -> CachedResponse:
+            response = self._render(await build())
+            return CachedResponse(
+                body=bytes(response.body),
+                media_type=response.media_type or "",
+                headers={
+                    name: value
+                    for name, value in response.headers.items()
+                    if name not in RENDERED_HEADERS
+                },
+            )
+
+        cached = await self.cache.get_or_load(
+            await self._get_cache_key(key_parts, namespaces),
+            render,
+            self.ttl,
+            encode=CachedResponse.encode,
+            decode=CachedResponse.decode,
+        )
+        if cached is None:
+            # render never returns None, but a tombstone left under the key
+            # reads as None, the response is then built without the cache
+            return self._render(await build())
+
+        return Response(
+            content=cached.body, media_type=cached.media_type, headers=cached.headers
+        )
+
+    async def _get_cache_key(
+        self, key_parts: Iterable[Any], namespaces: Iterable[str]
+    ) -> str:
+        generations = [
+            f"{namespace}={await self.generations.get(namespace)}"
+            for namespace in namespaces
+        ]
+        return ":".join([self.KEY_PREFIX, *generations, *map(str, key_parts)])
+
+    @staticmethod
+    def _render(content: Any) -> Response:
+        if isinstance(content, Response):
+            return content
+
+        return ORJSONResponse(content=jsonable_encoder(content))
+
+
+@lru_cache()
+def get_response_cache(
+    cache: Annotated[CacheAside, Depends(get_cache_aside)],
+    generations: Annotated[NamespaceGenerations, Depends(get_namespace_generations)],
+) -> ResponseCache:
+    return ResponseCache(
+        cache,
+        generations,
+        ttl=settings.response_cache_ttl,
+        enabled=settings.response_cache_enabled,
+    )
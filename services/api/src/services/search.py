@@ -1,10 +1,33 @@
+import base64
+import json
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
 from db.elastic import get_elastic
 from elasticsearch import AsyncElasticsearch, NotFoundError
 
+TIEBREAKER_FIELD = "id"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor was not issued by the search service."""
+
+
+class SearchError(Exception):
+    """Raised when one of the batched searches fails."""
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    items: list[dict[str, Any]]
+    next_cursor: Optional[str] = None
+    # Only counted on request, and never past the requested limit
+    total_hits: Optional[int] = None
+    # Cursor to the items after each item, to split the page into smaller ones
+    item_cursors: list[str] = field(default_factory=list)
+
 
 class SearchServiceABC(ABC):
     @abstractmethod
@@ -20,6 +43,21 @@ class SearchServiceABC(ABC):
         """
         ...
 
+    @abstractmethod
+    async def get_many(
+        self, resource: str, uuids: Sequence[str]
+    ) -> dict[str, Optional[Any]]:
+        """Retrieve many resources by their UUIDs in one request.
+
+        Args:
+            resource: The type/index of resource to query
+            uuids: Unique identifiers of the resources
+
+        Returns:
+            Resource data by UUID, None for resources that do not exist
+        """
+        ...
+
     @abstractmethod
     async def get_list(
         self, resource: str, page_size: int, page_number: int
@@ -69,6 +107,9 @@ class SearchServiceABC(ABC):
         page_size: int,
         page_number: int,
         sort: Optional[str] = None,
+        source_includes: Optional[Sequence[str]] = None,
+        source_excludes: Optional[Sequence[str]] = None,
+        request_cache: bool = False,
     ) -> list[dict[str, Any]]:
         """Search resources using a raw query.
 
@@ -78,6 +119,10 @@ class SearchServiceABC(ABC):
             page_size: Number of items per page
             page_number: Page number to retrieve (1-based)
             sort: Optional sort field with direction prefix (e.g. "-field_name")
+            source_includes: Optional fields to return, all fields by default
+            source_excludes: Optional fields to leave out of the results
+            request_cache: Cache the whole response on the shards until the
+                next refresh, only for queries without full-text scoring
 
         Returns:
             List of dictionaries containing matched resource data
@@ -85,6 +130,91 @@ class SearchServiceABC(ABC):
 
         ...
 
+    @abstractmethod
+    async def search_page(
+        self,
+        resource: str,
+        query: dict[str, Any],
+        page_size: int,
+        page_number: int = 1,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        source_includes: Optional[Sequence[str]] = None,
+        source_excludes: Optional[Sequence[str]] = None,
+        request_cache: bool = False,
+        count_hits_up_to: int = 0,
+    ) -> SearchPage:
+        """Search resources and return a page with a cursor to the next one.
+
+        Args:
+            resource: The type/index of resource to search
+            query: Raw query dictionary specific to storage backend
+            page_size: Number of items per page
+            page_number: Page number to retrieve (1-based), ignored with a cursor
+            sort: Optional sort field with direction prefix (e.g. "-field_name")
+            cursor: Opaque cursor returned with the previous page
+            source_includes: Optional fields to return, all fields by default
+            source_excludes: Optional fields to leave out of the results
+            request_cache: Cache the whole response on the shards until the
+                next refresh, only for queries without full-text scoring
+            count_hits_up_to: Count matching resources up to this number,
+                hits are not counted by default
+
+        Returns:
+            Page of matched resource data, the cursor to the next page, which
+            is None on the last page, and the cursor after every item
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+
+        ...
+
+    @abstractmethod
+    def encode_cursor(self, sort_values: Sequence[Any]) -> str:
+        """Build the cursor to the items after one with the given sort values.
+
+        Args:
+            sort_values: Values of the sort fields of the item, including the
+                id tiebreaker
+
+        Returns:
+            Opaque cursor accepted by ``search_page``
+        """
+        ...
+
+    @abstractmethod
+    async def search_raw_queries(
+        self,
+        resource: str,
+        queries: Sequence[dict[str, Any]],
+        page_size: int,
+        page_number: int = 1,
+        sort: Optional[str] = None,
+        source_includes: Optional[Sequence[str]] = None,
+        request_cache: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """Run several raw queries against a resource in one round-trip.
+
+        Args:
+            resource: The type/index of resource to search
+            queries: Raw query dictionaries specific to storage backend
+            page_size: Number of items per page of every query
+            page_number: Page number to retrieve (1-based)
+            sort: Optional sort field with direction prefix (e.g. "-field_name")
+            source_includes: Optional fields to return, all fields by default
+            request_cache: Cache the whole responses on the shards until the
+                next refresh, only for queries without full-text scoring
+
+        Returns:
+            Lists of matched resource data, in the order of the queries
+
+        Raises:
+            SearchError: If any of the queries fails
+        """
+
+        ...
+
 
 class ElasticsearchSearchService(SearchServiceABC):
     def __init__(self, elastic: AsyncElasticsearch):
@@ -98,6 +228,18 @@ class ElasticsearchSearchService(SearchServiceABC):
 
         return response["_source"]
 
+    async def get_many(
+        self, resource: str, uuids: Sequence[str]
+    ) -> dict[str, Optional[Any]]:
+        if not uuids:
+            return {}
+
+        response = await self.elastic.mget(index=resource, ids=list(uuids))
+        return {
+            doc["_id"]: doc["_source"] if doc.get("found") else None
+            for doc in response["docs"]
+        }
+
     async def search_by_field(
         self,
         resource: str,
@@ -122,20 +264,176 @@ class ElasticsearchSearchService(SearchServiceABC):
         page_size: int,
         page_number: int,
         sort: Optional[str] = None,
+        source_includes: Optional[Sequence[str]] = None,
+        source_excludes: Optional[Sequence[str]] = None,
+        request_cache: bool = False,
     ) -> list[dict[str, Any]]:
+        page = await self.search_page(
+            resource,
+            query,
+            page_size,
+            page_number=page_number,
+            sort=sort,
+            source_includes=source_includes,
+            source_excludes=source_excludes,
+            request_cache=request_cache,
+        )
+        return page.items
+
+    async def search_page(
+        self,
+        resource: str,
+        query: dict[str, Any],
+        page_size: int,
+        page_number: int = 1,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        source_includes: Optional[Sequence[str]] = None,
+        source_excludes: Optional[Sequence[str]] = None,
+        request_cache: bool = False,
+        count_hits_up_to: int = 0,
+    ) -> SearchPage:
+        search_query = self._build_search_query(
+            query,
+            page_size,
+            page_number,
+            sort=sort,
+            cursor=cursor,
+            source_includes=source_includes,
+            source_excludes=source_excludes,
+        )
+        if count_hits_up_to > 0:
+            search_query["track_total_hits"] = count_hits_up_to
+
+        # Without the flag the shard request cache only keeps size=0 responses
+        response = await self.elastic.search(
+            index=resource,
+            body=search_query,
+            request_cache=True if request_cache else None,
+        )
+        hits = response["hits"]["hits"]
+
+        item_cursors = [self._encode_cursor(hit["sort"]) for hit in hits]
+        next_cursor = item_cursors[-1] if len(hits) == page_size else None
+
+        total_hits = None
+        if count_hits_up_to > 0:
+            total_hits = response["hits"]["total"]["value"]
+
+        return SearchPage(
+            items=[hit["_source"] for hit in hits],
+            next_cursor=next_cursor,
+            total_hits=total_hits,
+            item_cursors=item_cursors,
+        )
+
+    def encode_cursor(self, sort_values: Sequence[Any]) -> str:
+        return self._encode_cursor(list(sort_values))
+
+    async def search_raw_queries(
+        self,
+        resource: str,
+        queries: Sequence[dict[str, Any]],
+        page_size: int,
+        page_number: int = 1,
+        sort: Optional[str] = None,
+        source_includes: Optional[Sequence[str]] = None,
+        request_cache: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        if not queries:
+            return []
+
+        header: dict[str, Any] = {"index": resource}
+        if request_cache:
+            header["request_cache"] = True
+
+        searches: list[dict[str, Any]] = []
+        for query in queries:
+            searches.append(header)
+            searches.append(
+                self._build_search_query(
+                    query,
+                    page_size,
+                    page_number,
+                    sort=sort,
+                    source_includes=source_includes,
+                )
+            )
+
+        response = await self.elastic.msearch(searches=searches)
+
+        results = []
+        for item in response["responses"]:
+            if "error" in item:
+                raise SearchError(item["error"])
+            results.append([hit["_source"] for hit in item["hits"]["hits"]])
+
+        return results
+
+    def _build_search_query(
+        self,
+        query: dict[str, Any],
+        page_size: int,
+        page_number: int,
+        sort: Optional[str] = None,
+        cursor: Optional[str] = None,
+        source_includes: Optional[Sequence[str]] = None,
+        source_excludes: Optional[Sequence[str]] = None,
+    ) -> dict[str, Any]:
+        sort_clause = self._get_sort_clause(sort)
+        # Hit counts are never rendered, so shards skip counting every match
         search_query: dict[str, Any] = {
             "query": query,
             "size": page_size,
-            "from": (page_number - 1) * page_size,
+            "sort": sort_clause,
+            "track_total_hits": False,
         }
 
-        if sort is not None:
-            sort_field = sort.lstrip("-")
-            order = "desc" if sort.startswith("-") else "asc"
-            search_query["sort"] = [{sort_field: {"order": order}}]
+        source: dict[str, list[str]] = {}
+        if source_includes is not None:
+            source["includes"] = list(source_includes)
+        if source_excludes is not None:
+            source["excludes"] = list(source_excludes)
+        if source:
+            search_query["_source"] = source
+
+        # search_after continues from the sort values of the last hit, so
+        # shards do not have to collect and sort every skipped hit.
+        if cursor is None:
+            search_query["from"] = (page_number - 1) * page_size
+        else:
+            search_query["search_after"] = self._decode_cursor(cursor, len(sort_clause))
+
+        return search_query
+
+    @staticmethod
+    def _get_sort_clause(sort: Optional[str]) -> list[Any]:
+        # Ties are broken by id, otherwise hits with equal sort values could
+        # be skipped or repeated between pages.
+        if sort is None:
+            return ["_score", {TIEBREAKER_FIELD: {"order": "asc"}}]
+
+        sort_field = sort.lstrip("-")
+        order = "desc" if sort.startswith("-") else "asc"
+        return [{sort_field: {"order": order}}, {TIEBREAKER_FIELD: {"order": "asc"}}]
+
+    @staticmethod
+    def _encode_cursor(sort_values: list[Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(sort_values).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str, size: int) -> list[Any]:
+        try:
+            sort_values = json.loads(base64.urlsafe_b64decode(cursor))
+        except ValueError as error:
+            raise InvalidCursorError(cursor) from error
+
+        if not isinstance(sort_values, list) or len(sort_values) != size:
+            raise InvalidCursorError(cursor)
+        if not all(isinstance(value, (str, int, float)) for value in sort_values):
+            raise InvalidCursorError(cursor)
 
-        response = await self.elastic.search(index=resource, body=search_query)
-        return [hit["_source"] for hit in response["hits"]["hits"]]
+        return sort_values
 
     async def get_list(
         self,
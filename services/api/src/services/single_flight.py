@@ -0,0 +1,52 @@
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, TypeVar
+
+from .stats import get_stats_reporter
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    collapsed: int = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key into one in-flight call.
+
+    The first caller for a key starts the call, every caller arriving while it
+    is still running awaits the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._in_flight: dict[str, asyncio.Future[Any]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.stats.collapsed += 1
+            return await asyncio.shield(in_flight)
+
+        self.stats.calls += 1
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shielded so that a cancelled leader does not cancel the call
+        # other callers are waiting on.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future[Any]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+
+@lru_cache()
+def get_single_flight() -> SingleFlight:
+    single_flight = SingleFlight()
+    get_stats_reporter().register("single_flight", single_flight.stats)
+    return single_flight
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Any
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StatsReporter:
+    """Logs the counters of the caching layers every ``interval`` seconds.
+
+    Components register their stats dataclasses under a name when they are
+    built, each report is one log line per name.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stats: dict[str, Any] = {}
+
+    def register(self, name: str, stats: Any) -> None:
+        self._stats[name] = stats
+
+    def report(self) -> None:
+        for name, stats in self._stats.items():
+            logger.info("%s stats: %s", name, asdict(stats))
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.report()
+
+
+@lru_cache()
+def get_stats_reporter() -> StatsReporter:
+    return StatsReporter(settings.stats_log_interval)
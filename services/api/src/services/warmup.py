@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Iterable
+
+from core.config import settings
+
+from .cache_aside import get_cache_aside
+from .film import FilmServiceABC, get_film_service
+from .generation import get_namespace_generations
+from .genre import GenreServiceABC, get_genre_service
+from .genre_catalog import get_genre_catalog
+from .rating_index import get_film_rating_index
+from .search import get_search_service
+
+logger = logging.getLogger(__name__)
+
+FILM_SORTS = ("-imdb_rating", "imdb_rating")
+
+
+class CacheWarmer:
+    """Prefetches the most requested pages into the cache.
+
+    Used on startup, before the application starts serving requests, and
+    after the ETL finishes a batch of changes.
+    """
+
+    def __init__(
+        self,
+        film_service: FilmServiceABC,
+        genre_service: GenreServiceABC,
+        film_pages: int,
+        page_size: int,
+        film_ids: Iterable[str],
+        timeout: float,
+    ):
+        self.film_service = film_service
+        self.genre_service = genre_service
+        self.film_pages = film_pages
+        self.page_size = page_size
+        self.film_ids = list(film_ids)
+        self.timeout = timeout
+
+    async def warm_up(self) -> None:
+        jobs: list[Awaitable] = [self.genre_service.list_genres(self.page_size, 1)]
+        jobs += [
+            self.film_service.list_films(self.page_size, page_number, sort=sort)
+            for sort in FILM_SORTS
+            for page_number in range(1, self.film_pages + 1)
+        ]
+        jobs += [self.film_service.get_by_id(film_id) for film_id in self.film_ids]
+
+        started_at = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout):
+                results = await asyncio.gather(*jobs, return_exceptions=True)
+        except TimeoutError:
+            logger.warning("Cache warm-up timed out after %s seconds", self.timeout)
+            return
+
+        failed = [result for result in results if isinstance(result, Exception)]
+        for error in failed:
+            logger.warning("Cache warm-up request failed", exc_info=error)
+
+        logger.info(
+            "Cache warm-up finished in %.2f seconds, %s of %s requests failed",
+            time.monotonic() - started_at,
+            len(failed),
+            len(jobs),
+        )
+
+
+def get_cache_warmer() -> CacheWarmer:
+    cache = get_cache_aside()
+    search_service = get_search_service()
+    generations = get_namespace_generations()
+
+    return CacheWarmer(
+        film_service=get_film_service(
+            cache=cache,
+            search_service=search_service,
+            generations=generations,
+            rating_index=get_film_rating_index(),
+        ),
+        genre_service=get_genre_service(
+            cache=cache,
+            search_service=search_service,
+            generations=generations,
+            catalog=get_genre_catalog(),
+        ),
+        film_pages=settings.cache_warmup_film_pages,
+        page_size=settings.cache_warmup_page_size,
+        film_ids=settings.cache_warmup_film_ids,
+        timeout=settings.cache_warmup_timeout,
+    )
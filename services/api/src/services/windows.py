@@ -0,0 +1,15 @@
+def page_windows(
+    page_size: int, page_number: int, window_size: int
+) -> tuple[range, slice]:
+    """Map an offset page onto aligned fixed-size result windows.
+
+    Returns the indexes (0-based) of the windows covering the page and the
+    slice of the page in the concatenated items of these windows, so pages
+    of any size are served from the same cached windows.
+    """
+    start = (page_number - 1) * page_size
+    end = start + page_size
+    first = start // window_size
+    offset = start - first * window_size
+
+    return range(first, (end - 1) // window_size + 1), slice(offset, offset + page_size)
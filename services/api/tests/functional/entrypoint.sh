@@ -2,6 +2,7 @@
 set -e
 
 poetry install
+(cd tests/unit && poetry run pytest)
 cd tests/functional
 
 poetry run utils/wait_for_es.py
@@ -16,7 +16,11 @@ async def make_get_request(client_http_session):
         full_url = settings.service_url + "/" + url
 
         async with client_http_session.get(full_url, params=query_data) as response:
-            response_dict = {"body": await response.json(), "status": response.status}
+            response_dict = {
+                "body": await response.json(),
+                "status": response.status,
+                "headers": response.headers,
+            }
         return response_dict
 
     return inner
@@ -3,6 +3,7 @@ import json
 import pytest_asyncio
 from redis.asyncio import Redis
 from settings import settings
+from utils.cache_value import decode_cache_value
 
 
 @pytest_asyncio.fixture(autouse=True)
@@ -20,7 +21,7 @@ async def redis_client():
 async def get_redis_cache(redis_client):
     async def inner(cache_key):
         data = await redis_client.get(cache_key)
-        return json.loads(data)
+        return json.loads(decode_cache_value(data))
 
     return inner
 
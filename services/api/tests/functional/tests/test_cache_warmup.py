@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+
+INVALIDATION_CHANNEL = "cache:invalidation"
+
+with open("resources/es_movies_mapping.json", "r") as f:
+    movies_mapping = json.load(f)
+with open("resources/es_genres_mapping.json", "r") as f:
+    genres_mapping = json.load(f)
+
+WARMED_KEY_PATTERNS = [
+    "films:list:ids:*:imdb_rating:None:window:100:0",
+    "films:list:ids:*:-imdb_rating:None:window:100:0",
+    "genres:list:*:window:100:0",
+]
+
+
+@pytest_asyncio.fixture(scope="module", autouse=True)
+async def seed_es(es_fill_index, es_movies_asset, es_genres_asset):
+    await es_fill_index("movies", movies_mapping, es_movies_asset)
+    await es_fill_index("genres", genres_mapping, es_genres_asset)
+
+
+async def find_keys(redis_client, timeout: float = 10) -> dict[str, list[bytes]]:
+    async with asyncio.timeout(timeout):
+        while True:
+            found = {
+                pattern: await redis_client.keys(pattern)
+                for pattern in WARMED_KEY_PATTERNS
+            }
+            if all(found.values()):
+                return found
+
+            await asyncio.sleep(0.1)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_warmed_up_after_etl_cycle(redis_client):
+    assert not await redis_client.keys("films:list:*")
+
+    await redis_client.publish(
+        INVALIDATION_CHANNEL, json.dumps({"event": "etl_cycle_completed"})
+    )
+    found = await find_keys(redis_client)
+
+    assert all(found.values())
@@ -83,6 +83,70 @@ async def test_get_non_existent_film_by_id(make_get_request):
     assert response["body"] == {"detail": "film not found"}
 
 
+@pytest.mark.asyncio
+async def test_get_film_by_malformed_id(make_get_request):
+    response = await make_get_request("api/v1/films/not-a-uuid")
+
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_get_films_by_ids(make_get_request):
+    uuids = [
+        "edc66eec-eda9-4541-af98-4ec4012a740d",
+        str(uuid4()),
+        "b1f1e8a6-e310-47d9-a93c-6a7b192bac0e",
+    ]
+
+    await make_get_request(f"api/v1/films/{uuids[2]}")
+    response = await make_get_request("api/v1/films/batch", [("ids", u) for u in uuids])
+
+    assert response["status"] == HTTPStatus.OK
+    assert [film["uuid"] for film in response["body"]] == [uuids[0], uuids[2]]
+
+
+@pytest.mark.asyncio
+async def test_get_films_by_repeated_ids(make_get_request):
+    uuids = [
+        "b1f1e8a6-e310-47d9-a93c-6a7b192bac0e",
+        "edc66eec-eda9-4541-af98-4ec4012a740d",
+        "b1f1e8a6-e310-47d9-a93c-6a7b192bac0e",
+    ]
+
+    response = await make_get_request("api/v1/films/batch", [("ids", u) for u in uuids])
+
+    assert response["status"] == HTTPStatus.OK
+    assert [film["uuid"] for film in response["body"]] == uuids[:2]
+
+
+@pytest.mark.parametrize(
+    "ids",
+    [[], [str(uuid4())] * 101, ["not-a-uuid"]],
+)
+@pytest.mark.asyncio
+async def test_get_films_by_ids_wrong_parameter(make_get_request, ids):
+    response = await make_get_request("api/v1/films/batch", [("ids", u) for u in ids])
+
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_non_existent_film_is_cached(
+    es_client, es_movies_asset, make_get_request
+):
+    film = {**es_movies_asset[0], "id": str(uuid4())}
+
+    response1 = await make_get_request(f"api/v1/films/{film['id']}")
+    await es_client.index(
+        index=index_name, id=film["id"], document=film, refresh="wait_for"
+    )
+    response2 = await make_get_request(f"api/v1/films/{film['id']}")
+    await es_client.delete(index=index_name, id=film["id"], refresh="wait_for")
+
+    assert response1["status"] == HTTPStatus.NOT_FOUND
+    assert response2["status"] == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.parametrize(
     "params",
     [
@@ -194,6 +258,34 @@ async def test_list_films_pagination_content(make_get_request):
     assert (response1["body"] + response2["body"]) == response3["body"]
 
 
+@pytest.mark.asyncio
+async def test_list_films_cursor_pagination(make_get_request):
+    url = "api/v1/films/"
+
+    response1 = await make_get_request(url, {"page_size": 50, "page_number": 2})
+    first_page = await make_get_request(url, {"page_size": 50, "page_number": 1})
+    cursor = first_page["headers"]["X-Next-Page-Cursor"]
+    response2 = await make_get_request(url, {"page_size": 50, "cursor": cursor})
+
+    assert response2["status"] == HTTPStatus.OK
+    assert len(response2["body"]) > 0
+    assert response1["body"] == response2["body"]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"page_size": 100, "page_number": 101},
+        {"cursor": "not-a-cursor"},
+    ],
+)
+@pytest.mark.asyncio
+async def test_list_films_pagination_rejected(make_get_request, params):
+    response = await make_get_request("api/v1/films/", params)
+
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.parametrize(
     "genre_id",
     [
@@ -231,6 +323,29 @@ async def test_list_films_by_genre(make_get_request, es_movies_asset, genre_id):
     assert len(responses_statuses) == 1 and responses_statuses.pop() == HTTPStatus.OK
 
 
+@pytest.mark.asyncio
+async def test_list_films_from_rating_index(
+    redis_client, es_movies_asset, make_get_request
+):
+    genre_id = str(uuid4())
+    movies = [movie for movie in es_movies_asset if movie["imdb_rating"]][:3]
+    await redis_client.zadd(
+        f"films:by_rating:genre:{genre_id}",
+        {movie["id"]: -movie["imdb_rating"] for movie in movies},
+    )
+    await redis_client.set("films:by_rating:ready", 1)
+
+    response = await make_get_request(
+        "api/v1/films/", {"genre": genre_id, "sort": "-imdb_rating"}
+    )
+    expected = sorted(movies, key=lambda movie: (-movie["imdb_rating"], movie["id"]))
+
+    assert response["status"] == HTTPStatus.OK
+    assert [film["uuid"] for film in response["body"]] == [
+        movie["id"] for movie in expected
+    ]
+
+
 @pytest.mark.parametrize(
     "params",
     [
@@ -53,15 +53,14 @@ async def test_genres_list(
     query_data,
     expected_answer,
 ):
-    cache_key = "genres:list"
-    page_size = query_data.get("page_size", "50")
-    cache_key += ":" + str(page_size)
-    page_number = query_data.get("page_number", "1")
-    cache_key += ":" + str(page_number)
+    cache_key = "genres:list:0:window:100:0"
+    page_size = query_data.get("page_size", 50)
+    page_number = query_data.get("page_number", 1)
+    page = slice((page_number - 1) * page_size, page_number * page_size)
 
     response = await make_get_request("api/v1/genres/", query_data)
     cache = await get_redis_cache(cache_key)
-    cache_ids = {obj["id"] for obj in cache}
+    cache_ids = {obj["id"] for obj in cache[page]}
     response_ids = {obj["uuid"] for obj in response["body"]}
 
     assert cache_ids == response_ids
@@ -80,3 +79,10 @@ async def test_genres_detail_200(get_redis_cache, make_get_request, es_client):
     assert response_2["status"] == 200
     assert response_2["body"] == obj
     assert cache_obj["id"] == obj["uuid"]
+
+
+@pytest.mark.asyncio
+async def test_genres_detail_malformed_id(make_get_request):
+    response = await make_get_request("api/v1/genres/not-a-uuid")
+
+    assert response["status"] == 422
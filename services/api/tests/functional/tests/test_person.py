@@ -42,6 +42,25 @@ async def test_get_person_by_id(make_get_request, es_persons_asset):
     assert isinstance(response["body"]["films"], list)
 
 
+@pytest.mark.asyncio
+async def test_get_person_with_stored_films(make_get_request, es_client):
+    person = {
+        "id": str(uuid4()),
+        "name": "Stored Filmography",
+        "films": [{"id": str(uuid4()), "roles": ["actor", "writer"]}],
+    }
+    await es_client.index(
+        index=index_name, id=person["id"], document=person, refresh="wait_for"
+    )
+
+    response = await make_get_request(f"api/v1/persons/{person['id']}")
+
+    assert response["status"] == HTTPStatus.OK
+    assert response["body"]["films"] == [
+        {"uuid": film["id"], "roles": film["roles"]} for film in person["films"]
+    ]
+
+
 @pytest.mark.parametrize("es_manager", index_name, indirect=True)
 @pytest.mark.asyncio
 async def test_person_by_id_cache(es_manager, make_get_request, es_persons_asset):
@@ -66,6 +85,13 @@ async def test_get_non_existent_person_by_id(make_get_request):
     assert response["status"] == HTTPStatus.NOT_FOUND
 
 
+@pytest.mark.asyncio
+async def test_get_person_by_malformed_id(make_get_request):
+    response = await make_get_request("api/v1/persons/not-a-uuid")
+
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.parametrize(
     "params",
     [
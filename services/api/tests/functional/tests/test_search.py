@@ -137,6 +137,33 @@ async def test_search_pagination(
     assert (response1["body"] + response2["body"]) == response3["body"]
 
 
+@pytest.mark.parametrize(
+    "query, search_phase",
+    [
+        ("Star Trek", "exact"),
+        ("Strar Trec", "fuzzy"),
+        ("Star Trec", "fuzzy"),
+    ],
+)
+@pytest.mark.asyncio
+async def test_search_phase(make_get_request, query, search_phase):
+    response = await make_get_request(SEARCH_URL, {"query": query})
+
+    assert response["status"] == HTTPStatus.OK
+    assert len(response["body"]) > 0
+    assert response["headers"]["X-Search-Phase"] == search_phase
+
+
+@pytest.mark.parametrize("query", ["star trek", "  STAR   Trek ", "Ｓｔａｒ\ttrek"])
+@pytest.mark.asyncio
+async def test_search_query_normalization(make_get_request, query):
+    expected = await make_get_request(SEARCH_URL, {"query": "Star Trek"})
+    response = await make_get_request(SEARCH_URL, {"query": query})
+
+    assert response["status"] == HTTPStatus.OK
+    assert response["body"] == expected["body"]
+
+
 @pytest.mark.asyncio
 async def test_non_existent_search_response(
     make_get_request,
@@ -179,6 +206,7 @@ async def test_search_cache(es_manager, make_get_request, params):
     [
         {"query": ""},
         {"query": "", "page_number": 1, "page_size": 100},
+        {"query": "   "},
         {"query": "an explosion on their moon", "page_number": -1, "page_size": 100},
         {"query": "Adventure Star Trek", "page_number": 0, "page_size": 10},
         {"query": "Gene Roddenberry", "page_number": 2, "page_size": 0},
@@ -0,0 +1,20 @@
+import zlib
+
+ZLIB_MARKER = b"\x00z"
+MARKER_SIZE = 2
+ENTRY_MARKER = b"\x00\x01"
+ENTRY_HEADER_SIZE = MARKER_SIZE + 16
+
+
+def decode_cache_value(data: bytes) -> bytes:
+    """
+    Strip the compression and cache entry envelope written by the API.
+
+    :param data: Raw value stored in Redis.
+    :return: Serialized payload of the cached value.
+    """
+    if data.startswith(ZLIB_MARKER):
+        data = zlib.decompress(data[MARKER_SIZE:])
+    if data.startswith(ENTRY_MARKER):
+        data = data[ENTRY_HEADER_SIZE:]
+    return data
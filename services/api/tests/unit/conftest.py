@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+
+# Unit tests import the API modules directly, without a running stack
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+for name, value in {
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_DB": "theatre",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "ES_URL": "http://localhost:9200",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+}.items():
+    os.environ.setdefault(name, value)
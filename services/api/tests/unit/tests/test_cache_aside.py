@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import pytest
+from services.cache_aside import CacheAside, CacheEntry
+from services.single_flight import SingleFlight
+from utils.memory_cache import MemoryCache
+
+
+def test_entry_round_trip():
+    entry = CacheEntry(value=b"payload", soft_expires_at=123.5)
+
+    assert CacheEntry.decode(entry.encode()) == entry
+
+
+def test_plain_value_never_goes_stale():
+    entry = CacheEntry.decode(b'{"id": 1}')
+
+    assert entry.value == b'{"id": 1}'
+    assert entry.is_fresh(now=time.time() + 10**9)
+
+
+def test_entry_is_stale_after_soft_expiry():
+    entry = CacheEntry(value=b"", soft_expires_at=100.0)
+
+    assert entry.is_fresh(now=99.9)
+    assert not entry.is_fresh(now=100.0)
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_and_refreshed_in_background():
+    cache = MemoryCache()
+    cache_aside = CacheAside(cache, SingleFlight(), stale_ttl=60)
+    stale = CacheEntry(value=b"old", soft_expires_at=time.time() - 1)
+    await cache.set("key", stale.encode(), 60)
+
+    async def load():
+        return "new"
+
+    value = await cache_aside.get_or_load("key", load, 10, str.encode, bytes.decode)
+    await asyncio.sleep(0.01)
+
+    assert value == "old"
+    assert CacheEntry.decode(cache.values["key"]).value == b"new"
+    assert cache.expires["key"] == 70
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_reloaded_without_stale_ttl():
+    cache = MemoryCache()
+    cache_aside = CacheAside(cache, SingleFlight())
+    stale = CacheEntry(value=b"old", soft_expires_at=time.time() - 1)
+    await cache.set("key", stale.encode(), 60)
+
+    async def load():
+        return "new"
+
+    value = await cache_aside.get_or_load("key", load, 10, str.encode, bytes.decode)
+
+    assert value == "new"
+
+
+@pytest.mark.asyncio
+async def test_undecodable_value_is_reloaded():
+    cache = MemoryCache()
+    cache_aside = CacheAside(cache, SingleFlight())
+    await cache.set("key", b"\xff not utf-8", 60)
+
+    async def load():
+        return "new"
+
+    value = await cache_aside.get_or_load("key", load, 10, str.encode, bytes.decode)
+
+    assert value == "new"
+    assert CacheEntry.decode(cache.values["key"]).value == b"new"
+
+
+@pytest.mark.asyncio
+async def test_undecodable_values_are_reloaded_in_batches():
+    cache = MemoryCache()
+    cache_aside = CacheAside(cache, SingleFlight())
+    await cache.set("a", b"\xff not utf-8", 60)
+    await cache.set("b", CacheEntry(b"cached", time.time() + 60).encode(), 60)
+
+    async def load(keys):
+        return {key: f"loaded {key}" for key in keys}
+
+    values = await cache_aside.get_many_or_load(
+        ["a", "b"], load, 10, str.encode, bytes.decode
+    )
+
+    assert values == {"a": "loaded a", "b": "cached"}
@@ -0,0 +1,95 @@
+import zlib
+
+import pytest
+from services.cache import (
+    LZ4_MARKER,
+    ZSTD_MARKER,
+    CompressedCacheService,
+    CompressionCodec,
+    get_compression_codecs,
+)
+from utils.memory_cache import MemoryCache
+
+ZLIB = CompressionCodec(
+    marker=b"\x00z", compress=zlib.compress, decompress=zlib.decompress
+)
+OTHER = CompressionCodec(marker=LZ4_MARKER, compress=bytes, decompress=bytes)
+
+LARGE_VALUE = b'{"title": "Star Trek"}' * 100
+
+
+@pytest.fixture
+def memory_cache():
+    return MemoryCache()
+
+
+@pytest.fixture
+def compressed(memory_cache):
+    return CompressedCacheService(memory_cache, min_size=64, codecs=[ZLIB])
+
+
+@pytest.mark.asyncio
+async def test_large_value_round_trip(memory_cache, compressed):
+    await compressed.set("key", LARGE_VALUE, 60)
+
+    stored = memory_cache.values["key"]
+    assert stored.startswith(ZLIB.marker)
+    assert len(stored) < len(LARGE_VALUE)
+    assert await compressed.get("key") == LARGE_VALUE
+    assert await compressed.mget("key", "missing") == [LARGE_VALUE, None]
+    assert compressed.stats.compressed == 1
+    assert compressed.stats.saved_bytes == len(LARGE_VALUE) - len(stored)
+
+
+@pytest.mark.asyncio
+async def test_small_value_is_stored_as_is(memory_cache, compressed):
+    await compressed.set_many({"key": b"small"}, 60)
+
+    assert memory_cache.values["key"] == b"small"
+    assert await compressed.get("key") == b"small"
+    assert compressed.stats.compressed == 0
+
+
+@pytest.mark.asyncio
+async def test_incompressible_value_is_stored_as_is(memory_cache, compressed):
+    value = bytes(range(256))
+
+    await compressed.set("key", value, 60)
+
+    assert memory_cache.values["key"] == value
+
+
+@pytest.mark.asyncio
+async def test_values_without_marker_are_returned_unchanged(memory_cache, compressed):
+    await memory_cache.set("key", b'{"written": "before compression"}', 60)
+
+    assert await compressed.get("key") == b'{"written": "before compression"}'
+
+
+@pytest.mark.asyncio
+async def test_values_of_other_known_codecs_are_decoded(memory_cache):
+    writer = CompressedCacheService(memory_cache, min_size=64, codecs=[ZLIB])
+    reader = CompressedCacheService(memory_cache, min_size=64, codecs=[OTHER, ZLIB])
+
+    await writer.set("key", LARGE_VALUE, 60)
+
+    assert await reader.get("key") == LARGE_VALUE
+
+
+@pytest.mark.asyncio
+async def test_values_of_unavailable_codecs_read_as_miss(memory_cache, compressed):
+    await memory_cache.set("key", ZSTD_MARKER + b"(\xb5/\xfd", 60)
+
+    assert await compressed.get("key") is None
+    assert await compressed.mget("key") == [None]
+
+
+@pytest.mark.asyncio
+async def test_corrupt_value_reads_as_miss(memory_cache, compressed):
+    await memory_cache.set("key", ZLIB.marker + b"not zlib", 60)
+
+    assert await compressed.get("key") is None
+
+
+def test_zlib_is_always_available():
+    assert get_compression_codecs()[-1].marker == ZLIB.marker
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from services.deadline import load_then_dependent
+
+
+class Lookup:
+    def __init__(self, result, delay: float = 0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, *_):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_dependent_gets_the_primary_result():
+    dependent = Lookup(["film"])
+
+    result = await load_then_dependent(Lookup({"id": 1})(), dependent)
+
+    assert result == ({"id": 1}, ["film"])
+    assert dependent.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_dependent_is_not_started_on_primary_miss():
+    dependent = Lookup(["film"])
+
+    result = await load_then_dependent(Lookup(None)(), dependent)
+
+    assert result == (None, None)
+    assert dependent.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_dependent_is_not_started_when_not_needed():
+    dependent = Lookup(["film"])
+
+    result = await load_then_dependent(
+        Lookup({"films": []})(),
+        dependent,
+        needs_dependent=lambda person: person.get("films") is None,
+    )
+
+    assert result == ({"films": []}, None)
+    assert dependent.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_is_shared_by_both_lookups():
+    dependent = Lookup(["film"], delay=0.06)
+
+    with pytest.raises(TimeoutError):
+        await load_then_dependent(
+            Lookup({"id": 1}, delay=0.06)(), dependent, timeout=0.1
+        )
+
+    assert dependent.calls == 1
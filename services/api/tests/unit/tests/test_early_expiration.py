@@ -0,0 +1,57 @@
+import pytest
+from services.cache_aside import CacheEntry
+
+from services import cache_aside
+
+
+class FixedRandom:
+    def __init__(self, value: float):
+        self.value = value
+
+    def random(self) -> float:
+        return self.value
+
+
+@pytest.fixture
+def draw(monkeypatch):
+    def set_draw(value: float):
+        monkeypatch.setattr(cache_aside, "random", FixedRandom(value))
+
+    return set_draw
+
+
+def test_delta_survives_round_trip():
+    entry = CacheEntry(value=b"v", soft_expires_at=100.0, delta=0.25)
+
+    assert CacheEntry.decode(entry.encode()).delta == 0.25
+
+
+def test_low_draw_keeps_entry_fresh(draw):
+    draw(0.0)
+    entry = CacheEntry(value=b"v", soft_expires_at=100.0, delta=5.0)
+
+    assert entry.is_fresh(now=99.0, beta=1.0)
+
+
+def test_high_draw_expires_expensive_entry_early(draw):
+    # -log(1 - 0.9) * 5 is about 11.5 seconds ahead of the soft expiry
+    draw(0.9)
+    entry = CacheEntry(value=b"v", soft_expires_at=100.0, delta=5.0)
+
+    assert not entry.is_fresh(now=90.0, beta=1.0)
+    assert entry.is_fresh(now=85.0, beta=1.0)
+
+
+def test_beta_scales_the_early_window(draw):
+    draw(0.9)
+    entry = CacheEntry(value=b"v", soft_expires_at=100.0, delta=5.0)
+
+    assert entry.is_fresh(now=90.0, beta=0.5)
+
+
+@pytest.mark.parametrize("beta, delta", [(0.0, 5.0), (1.0, 0.0)])
+def test_early_expiration_needs_beta_and_delta(draw, beta, delta):
+    draw(0.999)
+    entry = CacheEntry(value=b"v", soft_expires_at=100.0, delta=delta)
+
+    assert entry.is_fresh(now=99.0, beta=beta)
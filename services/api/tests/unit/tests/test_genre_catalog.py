@@ -0,0 +1,198 @@
+import asyncio
+import uuid
+
+import pytest
+from api.v1 import genres
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from services.cache_aside import CacheAside
+from services.genre import GenreService, get_genre_service
+from services.genre_catalog import GenreCatalog, get_genre_catalog
+from services.response_cache import ResponseCache, get_response_cache
+from services.single_flight import SingleFlight
+from utils.memory_cache import MemoryCache
+
+DRAMA_ID = str(uuid.uuid4())
+COMEDY_ID = str(uuid.uuid4())
+
+
+def genre(genre_id: str, name: str) -> dict:
+    return {"id": genre_id, "name": name, "description": None}
+
+
+class StubSearchService:
+    """Answers genre requests from ``genres``, or fails when ``fail`` is set."""
+
+    def __init__(self, genres: list[dict]):
+        self.genres = genres
+        self.calls = 0
+        self.fail = False
+
+    async def get(self, resource, uuid):
+        self.calls += 1
+        return next((item for item in self.genres if item["id"] == uuid), None)
+
+    async def get_list(self, resource, page_size, page_number, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("search is down")
+        page = slice((page_number - 1) * page_size, page_number * page_size)
+        return self.genres[page]
+
+
+class StubGenerations:
+    async def get(self, namespace: str) -> int:
+        return 0
+
+
+def make_catalog(search: StubSearchService, max_size: int = 10) -> GenreCatalog:
+    return GenreCatalog(search, max_size=max_size, refresh_interval=60)  # type: ignore
+
+
+def make_service(search: StubSearchService, catalog: GenreCatalog) -> GenreService:
+    cache = CacheAside(MemoryCache(), SingleFlight())  # type: ignore
+    return GenreService(cache, search, StubGenerations(), catalog=catalog)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_refresh_loads_snapshot():
+    catalog = make_catalog(
+        StubSearchService([genre(DRAMA_ID, "Drama"), genre(COMEDY_ID, "Comedy")])
+    )
+
+    await catalog.refresh()
+
+    assert catalog.snapshot is not None
+    assert [g.name for g in catalog.snapshot.genres] == ["Drama", "Comedy"]
+    assert catalog.snapshot.by_id[COMEDY_ID].name == "Comedy"
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_previous_snapshot():
+    search = StubSearchService([genre(DRAMA_ID, "Drama")])
+    catalog = make_catalog(search)
+    await catalog.refresh()
+    snapshot = catalog.snapshot
+
+    search.fail = True
+    await catalog.refresh()
+
+    assert catalog.snapshot is snapshot
+
+
+@pytest.mark.asyncio
+async def test_oversized_catalog_is_not_kept():
+    catalog = make_catalog(
+        StubSearchService([genre(DRAMA_ID, "Drama"), genre(COMEDY_ID, "Comedy")]),
+        max_size=1,
+    )
+
+    await catalog.refresh()
+
+    assert catalog.snapshot is None
+
+
+@pytest.mark.asyncio
+async def test_outdated_refresh_does_not_replace_newer_snapshot():
+    search = StubSearchService([genre(DRAMA_ID, "Drama")])
+    catalog = make_catalog(search)
+    gate = asyncio.Event()
+    get_list = search.get_list
+
+    async def slow_get_list(*args, **kwargs):
+        # The first refresh reads the old catalog, then waits for the gate
+        response = await get_list(*args, **kwargs)
+        await gate.wait()
+        return response
+
+    search.get_list = slow_get_list  # type: ignore
+    timer_refresh = asyncio.create_task(catalog.refresh())
+    await asyncio.sleep(0)
+
+    search.get_list = get_list  # type: ignore
+    search.genres = [genre(DRAMA_ID, "Drama (renamed)")]
+    await catalog.refresh()
+    gate.set()
+    await timer_refresh
+
+    assert catalog.snapshot is not None
+    assert catalog.snapshot.by_id[DRAMA_ID].name == "Drama (renamed)"
+
+
+@pytest.mark.asyncio
+async def test_service_serves_snapshot_without_search():
+    search = StubSearchService([genre(DRAMA_ID, "Drama"), genre(COMEDY_ID, "Comedy")])
+    catalog = make_catalog(search)
+    await catalog.refresh()
+    service = make_service(search, catalog)
+    search.calls = 0
+
+    page = await service.list_genres(page_size=1, page_number=2)
+    found = await service.get_by_id(DRAMA_ID)
+    missing = await service.get_by_id(str(uuid.uuid4()))
+
+    assert [g.name for g in page] == ["Comedy"]
+    assert found is not None and found.name == "Drama"
+    assert missing is None
+    assert search.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_swaps_snapshot():
+    search = StubSearchService([genre(DRAMA_ID, "Drama")])
+    catalog = make_catalog(search)
+    await catalog.refresh()
+    service = make_service(search, catalog)
+
+    search.genres = [genre(DRAMA_ID, "Drama (renamed)"), genre(COMEDY_ID, "Comedy")]
+    await service.invalidate([DRAMA_ID])
+
+    found = await service.get_by_id(DRAMA_ID)
+    assert found is not None and found.name == "Drama (renamed)"
+    assert [g.name for g in await service.list_genres(50, 1)] == [
+        "Drama (renamed)",
+        "Comedy",
+    ]
+
+
+def make_client(
+    catalog: GenreCatalog, search: StubSearchService, responses: MemoryCache
+) -> TestClient:
+    app = FastAPI()
+    app.include_router(genres.router, prefix="/api/v1/genres")
+    response_cache = ResponseCache(
+        CacheAside(responses, SingleFlight()),  # type: ignore
+        StubGenerations(),  # type: ignore
+        ttl=60,
+    )
+    app.dependency_overrides[get_genre_catalog] = lambda: catalog
+    app.dependency_overrides[get_genre_service] = lambda: make_service(search, catalog)
+    app.dependency_overrides[get_response_cache] = lambda: response_cache
+    return TestClient(app)
+
+
+def test_loaded_catalog_bypasses_response_cache():
+    search = StubSearchService([genre(DRAMA_ID, "Drama")])
+    catalog = make_catalog(search)
+    asyncio.run(catalog.refresh())
+    responses = MemoryCache()
+    client = make_client(catalog, search, responses)
+
+    listed = client.get("/api/v1/genres/")
+    detail = client.get(f"/api/v1/genres/{DRAMA_ID}")
+
+    assert listed.json() == [{"uuid": DRAMA_ID, "name": "Drama"}]
+    assert detail.json() == {"uuid": DRAMA_ID, "name": "Drama"}
+    assert responses.values == {}
+
+
+def test_responses_are_cached_until_catalog_loads():
+    search = StubSearchService([genre(DRAMA_ID, "Drama")])
+    catalog = make_catalog(search)
+    responses = MemoryCache()
+    client = make_client(catalog, search, responses)
+
+    listed = client.get("/api/v1/genres/")
+
+    assert listed.json() == [{"uuid": DRAMA_ID, "name": "Drama"}]
+    assert any(key.startswith("response:") for key in responses.values)
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from services.cache import LocalLRUCache
+from services.invalidation import CacheInvalidationSubscriber
+
+
+class FakePubSub:
+    def __init__(self, messages: list[dict]):
+        self.messages = messages
+        self.channels: list[str] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def subscribe(self, channel: str):
+        self.channels.append(channel)
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+
+
+class FakeRedis:
+    def __init__(self, messages: list[dict]):
+        self.messages = messages
+
+    def pubsub(self):
+        return FakePubSub(self.messages)
+
+
+class RecordingGenerations:
+    def __init__(self) -> None:
+        self.forgotten: list[str] = []
+        self.forgot_all = 0
+
+    def forget(self, namespace: str) -> None:
+        self.forgotten.append(namespace)
+
+    def forget_all(self) -> None:
+        self.forgot_all += 1
+
+
+class RecordingService:
+    def __init__(self) -> None:
+        self.invalidated: list[tuple] = []
+
+    async def invalidate(self, *args):
+        self.invalidated.append(args)
+
+
+def make_subscriber(messages, local_cache=None):
+    return CacheInvalidationSubscriber(
+        FakeRedis(messages),  # type: ignore
+        "cache:invalidation",
+        film_service=RecordingService(),  # type: ignore
+        genre_service=RecordingService(),  # type: ignore
+        person_service=RecordingService(),  # type: ignore
+        generations=RecordingGenerations(),  # type: ignore
+        local_cache=local_cache,
+    )
+
+
+@pytest.mark.asyncio
+async def test_subscribing_flushes_local_state():
+    local = LocalLRUCache(max_entries=10, max_bytes=100, max_ttl=60)
+    local.set("film:1", b"{}", 60)
+    subscriber = make_subscriber([], local_cache=local)
+
+    await subscriber.run()
+
+    assert len(local) == 0
+    assert subscriber.generations.forgot_all == 1  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_messages_evict_changed_entities():
+    movies = {"index": "movies", "ids": ["film-1"], "person_ids": ["person-1"]}
+    genres = {"index": "genres", "ids": ["genre-1"]}
+    subscriber = make_subscriber(
+        [
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": json.dumps(movies).encode()},
+            {"type": "message", "data": json.dumps(genres).encode()},
+        ]
+    )
+
+    await subscriber.run()
+
+    assert subscriber.film_service.invalidated == [  # type: ignore
+        (["film-1"], ["person-1"])
+    ]
+    assert subscriber.genre_service.invalidated == [(["genre-1"],)]  # type: ignore
+    assert subscriber.generations.forgotten == ["movies", "genres"]  # type: ignore
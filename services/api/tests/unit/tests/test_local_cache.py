@@ -0,0 +1,104 @@
+import pytest
+from services.cache import LocalLRUCache
+
+from services import cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+def test_evicts_least_recently_used_entry():
+    local = LocalLRUCache(max_entries=2, max_bytes=1024, max_ttl=60)
+
+    local.set("a", b"1", 60)
+    local.set("b", b"2", 60)
+    local.get("a")
+    local.set("c", b"3", 60)
+
+    assert local.get("a") == b"1"
+    assert local.get("b") is None
+    assert local.get("c") == b"3"
+    assert local.stats.evictions == 1
+
+
+def test_evicts_entries_above_byte_limit():
+    local = LocalLRUCache(max_entries=10, max_bytes=10, max_ttl=60)
+
+    local.set("a", b"x" * 4, 60)
+    local.set("b", b"x" * 4, 60)
+    local.set("c", b"x" * 4, 60)
+
+    assert local.get("a") is None
+    assert local.size == 8
+    assert len(local) == 2
+
+
+def test_skips_values_larger_than_byte_limit():
+    local = LocalLRUCache(max_entries=10, max_bytes=10, max_ttl=60)
+
+    local.set("a", b"x" * 4, 60)
+    local.set("big", b"x" * 11, 60)
+
+    assert local.get("big") is None
+    assert local.get("a") == b"x" * 4
+    assert local.stats.evictions == 0
+
+
+def test_replacing_a_key_keeps_size_accurate():
+    local = LocalLRUCache(max_entries=10, max_bytes=100, max_ttl=60)
+
+    local.set("a", b"x" * 10, 60)
+    local.set("a", b"x" * 3, 60)
+    local.delete("a")
+
+    assert local.size == 0
+    assert len(local) == 0
+
+
+def test_ttl_is_capped_by_max_ttl(clock):
+    local = LocalLRUCache(max_entries=10, max_bytes=100, max_ttl=5)
+
+    local.set("a", b"1", 60)
+    clock.now += 4
+    assert local.get("a") == b"1"
+
+    clock.now += 1
+    assert local.get("a") is None
+    assert local.stats.expirations == 1
+    assert len(local) == 0
+
+
+def test_entries_expire_with_their_own_ttl(clock):
+    local = LocalLRUCache(max_entries=10, max_bytes=100, max_ttl=60)
+
+    local.set("a", b"1", 2)
+    local.set("b", b"2", 0)
+    clock.now += 2
+
+    assert local.get("a") is None
+    assert local.get("b") is None
+    assert local.stats.misses == 2
+
+
+def test_clear_drops_all_entries():
+    local = LocalLRUCache(max_entries=10, max_bytes=100, max_ttl=60)
+    local.set("a", b"1", 60)
+    local.set("b", b"22", 60)
+
+    local.clear()
+
+    assert len(local) == 0
+    assert local.size == 0
+    assert local.get("a") is None
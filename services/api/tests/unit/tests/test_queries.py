@@ -0,0 +1,15 @@
+from services.queries import films_search
+
+
+def test_exact_search_requires_every_term():
+    query = films_search("star trec", fuzzy=False)
+
+    assert query["multi_match"]["operator"] == "and"
+    assert "fuzziness" not in query["multi_match"]
+
+
+def test_fuzzy_search_matches_any_term():
+    query = films_search("star trec")
+
+    assert query["multi_match"]["fuzziness"] == "AUTO"
+    assert "operator" not in query["multi_match"]
@@ -0,0 +1,16 @@
+from services.query_text import MAX_QUERY_KEY_LENGTH, query_cache_key
+
+
+def test_short_text_is_kept_verbatim():
+    assert query_cache_key("star wars") == "star wars"
+
+
+def test_long_text_is_replaced_by_its_hash():
+    cursor = "c" * (MAX_QUERY_KEY_LENGTH + 1)
+
+    key = query_cache_key(cursor)
+
+    assert key.startswith("sha256-")
+    assert len(key) == len("sha256-") + 64
+    assert key == query_cache_key(cursor)
+    assert key != query_cache_key(cursor + "c")
@@ -0,0 +1,51 @@
+import pytest
+from services.cache_aside import TOMBSTONE, CacheAside
+from services.response_cache import ResponseCache
+from services.single_flight import SingleFlight
+from utils.memory_cache import MemoryCache
+
+
+class StubGenerations:
+    async def get(self, namespace: str) -> int:
+        return 3
+
+
+def make_response_cache(cache: MemoryCache) -> ResponseCache:
+    return ResponseCache(
+        CacheAside(cache, SingleFlight()),  # type: ignore
+        StubGenerations(),  # type: ignore
+        ttl=60,
+    )
+
+
+@pytest.mark.asyncio
+async def test_hits_return_cached_bytes():
+    cache = MemoryCache()
+    response_cache = make_response_cache(cache)
+    builds = 0
+
+    async def build():
+        nonlocal builds
+        builds += 1
+        return {"id": 1}
+
+    first = await response_cache.respond(("films", 1), build, namespaces=("movies",))
+    second = await response_cache.respond(("films", 1), build, namespaces=("movies",))
+
+    assert builds == 1
+    assert first.body == second.body == b'{"id":1}'
+    assert list(cache.values) == ["response:movies=3:films:1"]
+
+
+@pytest.mark.asyncio
+async def test_tombstone_under_key_builds_response():
+    cache = MemoryCache()
+    cache.values["response:movies=3:films:1"] = TOMBSTONE
+    response_cache = make_response_cache(cache)
+
+    async def build():
+        return {"id": 1}
+
+    response = await response_cache.respond(("films", 1), build, namespaces=("movies",))
+
+    assert response.body == b'{"id":1}'
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_call():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.create_task(single_flight.do("key", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["value"] * 3
+    assert calls == 1
+    assert single_flight.stats.calls == 1
+    assert single_flight.stats.collapsed == 2
+
+
+@pytest.mark.asyncio
+async def test_error_is_raised_to_every_caller():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        raise ValueError("backend down")
+
+    waiters = [asyncio.create_task(single_flight.do("key", load)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_key_is_released_after_the_call():
+    single_flight = SingleFlight()
+
+    async def load():
+        return single_flight.stats.calls
+
+    assert await single_flight.do("key", load) == 1
+    assert await single_flight.do("key", load) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers():
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "value"
+
+    leader = asyncio.create_task(single_flight.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(single_flight.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    assert await follower == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
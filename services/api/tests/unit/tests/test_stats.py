@@ -0,0 +1,16 @@
+import logging
+
+from services.cache import CacheStats
+from services.stats import StatsReporter
+
+
+def test_report_logs_registered_stats(caplog):
+    reporter = StatsReporter(interval=60)
+    reporter.register("local_cache", CacheStats(hits=3, misses=1))
+
+    with caplog.at_level(logging.INFO, logger="services.stats"):
+        reporter.report()
+
+    assert caplog.messages == [
+        "local_cache stats: {'hits': 3, 'misses': 1, 'evictions': 0, 'expirations': 0}"
+    ]
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from services.warmup import CacheWarmer
+
+
+class RecordingService:
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.calls: list[tuple] = []
+        self.fail = fail
+        self.delay = delay
+
+    async def list_films(self, page_size, page_number, sort):
+        return await self._record("list_films", page_size, page_number, sort)
+
+    async def get_by_id(self, film_id):
+        return await self._record("get_by_id", film_id)
+
+    async def list_genres(self, page_size, page_number):
+        return await self._record("list_genres", page_size, page_number)
+
+    async def _record(self, *call):
+        self.calls.append(call)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ValueError("backend down")
+
+
+def make_warmer(film_service, genre_service, timeout=1.0):
+    return CacheWarmer(
+        film_service=film_service,  # type: ignore
+        genre_service=genre_service,  # type: ignore
+        film_pages=2,
+        page_size=50,
+        film_ids=["film-id"],
+        timeout=timeout,
+    )
+
+
+@pytest.mark.asyncio
+async def test_warms_up_configured_pages():
+    films, genres = RecordingService(), RecordingService()
+
+    await make_warmer(films, genres).warm_up()
+
+    assert sorted(films.calls) == [
+        ("get_by_id", "film-id"),
+        ("list_films", 50, 1, "-imdb_rating"),
+        ("list_films", 50, 1, "imdb_rating"),
+        ("list_films", 50, 2, "-imdb_rating"),
+        ("list_films", 50, 2, "imdb_rating"),
+    ]
+    assert genres.calls == [("list_genres", 50, 1)]
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_do_not_stop_warm_up():
+    films, genres = RecordingService(fail=True), RecordingService()
+
+    await make_warmer(films, genres).warm_up()
+
+    assert len(films.calls) == 5
+    assert genres.calls == [("list_genres", 50, 1)]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_gives_up_after_timeout():
+    films, genres = RecordingService(delay=1), RecordingService()
+
+    await make_warmer(films, genres, timeout=0.05).warm_up()
+
+    assert len(films.calls) == 5
@@ -0,0 +1,27 @@
+from typing import Mapping, Optional
+
+
+class MemoryCache:
+    """Cache service keeping values in a dict, expiry times are recorded only."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.expires: dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    async def mget(self, *keys: str) -> list[Optional[bytes]]:
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, expire: int):
+        self.values[key] = value
+        self.expires[key] = expire
+
+    async def set_many(self, values: Mapping[str, bytes], expire: int):
+        for key, value in values.items():
+            await self.set(key, value, expire)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.values.pop(key, None)
@@ -0,0 +1,73 @@
+import json
+
+from redis import Redis, RedisError
+from schemas.elasticsearch import ESMovieDocument, ESPersonDocument, Genre
+from utils.logging_settings import logger
+
+GENERATION_KEY = "cache:generation:{index}"
+
+# Ключи сущностей в кэше API, которые строятся из документов индекса
+PERSON_FILMS_KEY = "person:{id}:film_ids"
+ENTITY_KEYS = {
+    "movies": ("film:{id}",),
+    "genres": ("genre:{id}",),
+    # Фильмография персоны пересобирается вместе с её документом
+    "persons": ("person:{id}", PERSON_FILMS_KEY),
+}
+
+
+class CacheInvalidator:
+    """Инвалидирует кэш API после загрузки документов.
+
+    Увеличивает поколение индекса, из которого строятся ключи кэша списков
+    и поиска, и удаляет из Redis закэшированные изменённые сущности. Pub/Sub
+    не хранит сообщения, пока API перезапускается, поэтому через него id
+    изменённых документов доходят только до локального кэша процессов API.
+    """
+
+    def __init__(self, redis: Redis, channel: str):
+        self.redis = redis
+        self.channel = channel
+
+    def publish(
+        self,
+        docs: dict[str, ESMovieDocument | Genre | ESPersonDocument],
+        index_name: str,
+    ) -> None:
+        ids = [str(doc.id) for doc in docs.values()]
+        message: dict[str, str | list[str]] = {"index": index_name, "ids": ids}
+
+        person_ids = {
+            str(person.id)
+            for doc in docs.values()
+            if isinstance(doc, ESMovieDocument)
+            for person in doc.persons
+        }
+        if person_ids:
+            message["person_ids"] = sorted(person_ids)
+
+        entity_keys = [
+            key.format(id=doc_id) for doc_id in ids for key in ENTITY_KEYS[index_name]
+        ]
+        entity_keys.extend(
+            PERSON_FILMS_KEY.format(id=person_id) for person_id in sorted(person_ids)
+        )
+
+        try:
+            pipeline = self.redis.pipeline()
+            pipeline.incr(GENERATION_KEY.format(index=index_name))
+            pipeline.delete(*entity_keys)
+            pipeline.publish(self.channel, json.dumps(message))
+            pipeline.execute()
+        except RedisError:
+            # Кэш API всё равно устареет по TTL, поэтому загрузку не прерываем
+            logger.warning(f"Не удалось отправить инвалидацию кэша для {index_name}")
+
+    def publish_cycle_completed(self) -> None:
+        """Сообщить API, что пачка изменений загружена и кэш можно прогреть."""
+        try:
+            self.redis.publish(
+                self.channel, json.dumps({"event": "etl_cycle_completed"})
+            )
+        except RedisError:
+            logger.warning("Не удалось отправить событие о завершении загрузки")
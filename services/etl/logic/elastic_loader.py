@@ -1,39 +1,168 @@
+import hashlib
 import json
+from typing import Iterator
 
 import requests
-from schemas.elasticsearch import ESMovieDocument, Genre
+from logic.cache_invalidator import CacheInvalidator
+from logic.rating_index import FilmRatingIndex
+from schemas.elasticsearch import ESMovieDocument, ESPersonDocument, Genre
 from utils.backoff import backoff
 from utils.logging_settings import logger
 
+DEFINITION_HASH_LENGTH = 12
+
 
 class ElasticSearchLoader:
 
-    def create_index(self, file_path: str, index_name: str):
+    def create_index(self, file_path: str, alias: str) -> str:
+        """Создать индекс по описанию из файла и направить на него алиас.
+
+        Индексы версионируются хэшем описания, он же хранится в _meta
+        маппинга. Если описание поменялось, документы переносятся в новый
+        индекс через _reindex, и алиас атомарно переключается на него.
+        Возвращает имя индекса, на который указывает алиас.
+        """
         with open(file_path, "r") as f:
             index_data = json.load(f)
 
+        definition_hash = hashlib.sha256(
+            json.dumps(index_data, sort_keys=True).encode()
+        ).hexdigest()[:DEFINITION_HASH_LENGTH]
+        index_name = f"{alias}_{definition_hash}"
+
+        current_index = self._get_current_index(alias)
+        if current_index == index_name:
+            return index_name
+
+        index_data["mappings"]["_meta"] = {"definition_hash": definition_hash}
         request = requests.put(
             f"{self.base_url}/{index_name}",
             json=index_data,
             headers={"Content-Type": "application/json"},
         )
         status_code = request.status_code
-        if status_code == 400:
-            logger.warning("Elastic WARNING:\n" + str(request.json()))
-        if status_code == 500:
-            logger.error("Elastic ERROR:\n" + str(request.json()))
+        if status_code == 400 and self._index_exists(request.json()):
+            # Остался от прерванной миграции, документы перенесутся заново
+            logger.info(f"Индекс {index_name} уже создан")
+        else:
+            if status_code == 400:
+                logger.warning("Elastic WARNING:\n" + str(request.json()))
+            if status_code == 500:
+                logger.error("Elastic ERROR:\n" + str(request.json()))
+            request.raise_for_status()
+
+        actions: list[dict] = [{"add": {"index": index_name, "alias": alias}}]
+        if current_index is not None:
+            logger.info(f"Переносим документы из {current_index} в {index_name}")
+            self._reindex(current_index, index_name)
+            # Старый индекс удаляется в том же запросе, что и переключает
+            # алиас, поэтому он же снимает индекс без алиаса из старых версий
+            actions.append({"remove_index": {"index": current_index}})
+
+        response = requests.post(f"{self.base_url}/_aliases", json={"actions": actions})
+        response.raise_for_status()
+        return index_name
+
+    def _get_current_index(self, alias: str) -> str | None:
+        response = requests.get(f"{self.base_url}/{alias}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+
+        # Ответ по алиасу и по индексу содержит настоящее имя индекса
+        return next(iter(response.json()))
+
+    @staticmethod
+    def _index_exists(response: dict) -> bool:
+        error_type = response.get("error", {}).get("type")
+        return error_type == "resource_already_exists_exception"
+
+    def _reindex(self, source: str, dest: str) -> None:
+        response = requests.post(
+            f"{self.base_url}/_reindex",
+            params={"wait_for_completion": "true", "refresh": "true"},
+            json={"source": {"index": source}, "dest": {"index": dest}},
+        )
+        response.raise_for_status()
+
+        failures = response.json().get("failures")
+        if failures:
+            raise RuntimeError(f"Не удалось перенести {source} в {dest}: {failures}")
 
     @backoff()
-    def create_indexes(self) -> None:
-        self.create_index("resources/movie_index.json", "movies")
-        self.create_index("resources/genre_index.json", "genres")
-        self.create_index("resources/person_index.json", "persons")
+    def create_indexes(self) -> dict[str, str]:
+        """Создать индексы и вернуть их имена по алиасам."""
+        return {
+            alias: self.create_index(file_path, alias)
+            for file_path, alias in (
+                ("resources/movie_index.json", "movies"),
+                ("resources/genre_index.json", "genres"),
+                ("resources/person_index.json", "persons"),
+            )
+        }
 
-    def __init__(self, api_url: str):
+    def __init__(
+        self,
+        api_url: str,
+        cache_invalidator: CacheInvalidator | None = None,
+        rating_index: FilmRatingIndex | None = None,
+    ):
         self.base_url = api_url  # noqa: E231
+        self.cache_invalidator = cache_invalidator
+        self.rating_index = rating_index
+
+    def iter_documents(
+        self,
+        index_name: str,
+        fields: list[str],
+        batch_size: int = 1000,
+        query: dict | None = None,
+    ) -> Iterator[list[dict]]:
+        """Выгрузить поля документов индекса пачками по batch_size.
+
+        Без query выгружаются все документы индекса.
+        """
+        search_after = None
+        while True:
+            body: dict = {
+                "query": query or {"match_all": {}},
+                "size": batch_size,
+                "sort": [{"id": "asc"}],
+                "_source": fields,
+            }
+            if search_after is not None:
+                body["search_after"] = search_after
+
+            response = requests.post(f"{self.base_url}/{index_name}/_search", json=body)
+            response.raise_for_status()
+            hits = response.json()["hits"]["hits"]
+            if not hits:
+                return
+
+            yield [hit["_source"] for hit in hits]
+            search_after = hits[-1]["sort"]
+
+    @backoff()
+    def get_persons_with_films(self, films_ids: list[str]) -> set[str]:
+        """Id персон, в фильмографии которых есть хотя бы один из фильмов."""
+        if not films_ids:
+            return set()
+
+        query = {
+            "nested": {"path": "films", "query": {"terms": {"films.id": films_ids}}}
+        }
+        return {
+            doc["id"]
+            for batch in self.iter_documents("persons", ["id"], query=query)
+            for doc in batch
+        }
 
     @backoff()
-    def load(self, docs: dict[str, ESMovieDocument | Genre], index_name: str) -> int:
+    def load(
+        self,
+        docs: dict[str, ESMovieDocument | Genre | ESPersonDocument],
+        index_name: str,
+    ) -> int:
         if len(docs) == 0:
             logger.info(f"Загрузка {index_name} не требуется")
             return 0
@@ -45,11 +174,39 @@ class ElasticSearchLoader:
             request_body += f"{json.dumps(id_row)}\n"  # Строка с id
             request_body += f"{doc.model_dump_json()}\n"  # Строка с объектом
         request_body += "\n"  # Необходим перенос строки в конце
+        # Кэш API инвалидируется после загрузки, поэтому документы должны
+        # стать видны поиску до того, как API перестроит списки
         response = requests.post(
             f"{self.base_url}/_bulk",
+            params={"refresh": "wait_for"},
             headers={"Content-Type": "application/x-ndjson"},
             data=request_body,
         )
         logger.info(response.status_code)
+        response.raise_for_status()
+        self._check_bulk_errors(response.json(), index_name)
+
+        if self.rating_index and index_name == "movies":
+            self.rating_index.update(docs)  # type: ignore
+
+        if self.cache_invalidator:
+            self.cache_invalidator.publish(docs, index_name)
 
         return len(docs)
+
+    @staticmethod
+    def _check_bulk_errors(response: dict, index_name: str) -> None:
+        """Поднять ошибку, если часть документов не загрузилась.
+
+        _bulk отвечает 200 и при ошибках отдельных документов, они видны
+        только в элементах ответа.
+        """
+        if not response.get("errors"):
+            return
+
+        failures = [
+            item["index"]
+            for item in response["items"]
+            if "error" in item.get("index", {})
+        ]
+        raise RuntimeError(f"Не удалось загрузить документы в {index_name}: {failures}")
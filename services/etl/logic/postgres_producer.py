@@ -1,14 +1,25 @@
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Tuple
 
 import psycopg
 from psycopg import ClientCursor, Cursor
 from psycopg.rows import dict_row
-from schemas.elasticsearch import ESMovieDocument, Genre, GenreBaseInfo, Person
+from schemas.elasticsearch import (
+    ESMovieDocument,
+    ESPersonDocument,
+    Genre,
+    GenreBaseInfo,
+    Person,
+    PersonFilm,
+)
 from utils.backoff import backoff
 from utils.logging_settings import logger
 from utils.state import State
 
+PERSON_ROLES = ("actor", "director", "writer")
+PERSONS_INDEX_STATE_PREFIX = "person_index"
+PERSONS_INDEX_STATE_KEY = f"{PERSONS_INDEX_STATE_PREFIX}_person_state"
+
 
 class PostgresProducer:
     def __init__(self, connect_data: dict, state: State):
@@ -209,8 +220,13 @@ class PostgresProducer:
     @backoff()
     def _get_person_by_ids(self, persons_ids, cursor):
         query = """
-                SELECT p.id, p.full_name as name
+                SELECT
+                    p.id,
+                    p.full_name as name,
+                    pfw.film_work_id as fw_id,
+                    pfw.role as pfw_role
                 FROM content.person p
+                LEFT JOIN content.person_film_work pfw ON pfw.person_id = p.id
                 WHERE p.id = ANY(%s)
                 """
         cursor.execute(query, (persons_ids,))
@@ -224,10 +240,29 @@ class PostgresProducer:
             docs[doc.id] = doc
         return docs
 
-    def _merge_persons_to_models(self, persons_data: List[dict]) -> Dict[str, Person]:
+    def _merge_persons_to_models(
+        self, persons_data: List[dict]
+    ) -> Dict[str, ESPersonDocument]:
+        # Роли собираем заранее, чтобы API отдавал персону одним документом
+        films_roles: Dict[str, Dict[str, set]] = {}
+        names: Dict[str, str] = {}
+        for row in persons_data:
+            person_id = str(row["id"])
+            names[person_id] = row["name"]
+            person_films = films_roles.setdefault(person_id, {})
+            if row.get("fw_id") and row.get("pfw_role") in PERSON_ROLES:
+                person_films.setdefault(str(row["fw_id"]), set()).add(row["pfw_role"])
+
         docs = {}
-        for person in persons_data:
-            doc = Person(**person)
+        for person_id, person_films in films_roles.items():
+            doc = ESPersonDocument(
+                id=person_id,
+                name=names[person_id],
+                films=[
+                    PersonFilm(id=film_id, roles=sorted(roles))
+                    for film_id, roles in person_films.items()
+                ],
+            )
             docs[doc.id] = doc
         return docs
 
@@ -245,14 +280,35 @@ class PostgresProducer:
             return model_objects
 
     @backoff()
-    def get_modified_persons(self) -> dict[str, Person]:
+    def get_modified_persons(self) -> dict[str, ESPersonDocument]:
         with psycopg.connect(
             **self.connect_data, row_factory=dict_row, cursor_factory=ClientCursor
         ) as pg_conn:
             cursor = pg_conn.cursor()
             persons_ids = self._get_modified_ids(
-                "person", cursor, state_prefix="person_index"
+                "person", cursor, state_prefix=PERSONS_INDEX_STATE_PREFIX
             )
             persons_data = self._get_person_by_ids(persons_ids, cursor)
             model_objects = self._merge_persons_to_models(persons_data)
             return model_objects
+
+    def reset_modified_persons(self) -> None:
+        """Начать выгрузку персон для индекса заново, с самых старых записей."""
+        self.state.set_state_json(PERSONS_INDEX_STATE_KEY, None)
+
+    @backoff()
+    def get_persons_by_ids(
+        self, persons_ids: Iterable[str]
+    ) -> dict[str, ESPersonDocument]:
+        """Персоны, фильмография которых могла измениться вместе с фильмами."""
+        persons_ids = list(persons_ids)
+        if not persons_ids:
+            return {}
+
+        with psycopg.connect(
+            **self.connect_data, row_factory=dict_row, cursor_factory=ClientCursor
+        ) as pg_conn:
+            cursor = pg_conn.cursor()
+            persons_data = self._get_person_by_ids(persons_ids, cursor)
+            model_objects = self._merge_persons_to_models(persons_data)
+            return model_objects
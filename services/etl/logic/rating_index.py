@@ -0,0 +1,105 @@
+from typing import Iterable, Optional, cast
+
+from redis import Redis, RedisError
+from schemas.elasticsearch import ESMovieDocument
+from utils.logging_settings import logger
+
+READY_KEY = "films:by_rating:ready"
+ALL_FILMS_KEY = "films:by_rating:all"
+GENRE_FILMS_KEY = "films:by_rating:genre:{genre_id}"
+FILM_GENRES_KEY = "films:by_rating:film_genres"
+
+# Поля документа фильма, из которых строятся списки
+RATING_INDEX_FIELDS = ["id", "imdb_rating", "genres.id"]
+UNRATED_SCORE = float("inf")
+
+FilmEntry = tuple[str, float | None, set[str]]
+
+
+class FilmRatingIndex:
+    """Поддерживает в Redis списки фильмов, упорядоченные по рейтингу.
+
+    Для всех фильмов и для каждого жанра хранится sorted set с id фильмов.
+    Оценка — рейтинг со знаком минус, чтобы ZRANGE отдавал фильмы в порядке
+    сортировки API: по убыванию рейтинга, при равном рейтинге по id. Фильмы
+    без рейтинга получают оценку +inf и, как в Elasticsearch, идут в конце.
+
+    Жанры каждого фильма запоминаются в хэше, чтобы при смене жанров убрать
+    фильм из прежних списков. Метка готовности ставится после полной
+    перестройки и снимается, если обновление не удалось.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._stale = False
+
+    def is_ready(self) -> bool:
+        return not self._stale and bool(self.redis.exists(READY_KEY))
+
+    def update(self, films: dict[str, ESMovieDocument]) -> None:
+        try:
+            self._write(
+                (
+                    str(film.id),
+                    film.imdb_rating,
+                    {str(genre.id) for genre in film.genres},
+                )
+                for film in films.values()
+            )
+        except RedisError:
+            # Без метки API читает списки из Elasticsearch до перестройки
+            logger.warning("Не удалось обновить списки фильмов по рейтингу")
+            self._stale = True
+            try:
+                self.redis.delete(READY_KEY)
+            except RedisError:
+                pass
+
+    def rebuild(self, batches: Iterable[list[dict]]) -> None:
+        """Перестроить списки заново из документов фильмов."""
+        logger.info("Перестраиваем списки фильмов по рейтингу")
+        self.redis.delete(READY_KEY, ALL_FILMS_KEY, FILM_GENRES_KEY)
+        genre_keys = list(
+            self.redis.scan_iter(match=GENRE_FILMS_KEY.format(genre_id="*"))
+        )
+        if genre_keys:
+            self.redis.delete(*genre_keys)
+
+        for batch in batches:
+            self._write(
+                (
+                    doc["id"],
+                    doc.get("imdb_rating"),
+                    {genre["id"] for genre in doc.get("genres", [])},
+                )
+                for doc in batch
+            )
+
+        self.redis.set(READY_KEY, 1)
+        self._stale = False
+
+    def _write(self, films: Iterable[FilmEntry]) -> None:
+        films = list(films)
+        if not films:
+            return
+
+        previous_genres = cast(
+            list[Optional[bytes]],
+            self.redis.hmget(FILM_GENRES_KEY, [film_id for film_id, _, _ in films]),
+        )
+        pipeline = self.redis.pipeline()
+        for (film_id, rating, genre_ids), previous in zip(films, previous_genres):
+            keys = [ALL_FILMS_KEY]
+            keys += [
+                GENRE_FILMS_KEY.format(genre_id=genre_id) for genre_id in genre_ids
+            ]
+            if previous:
+                for genre_id in set(previous.decode().split(",")) - genre_ids:
+                    pipeline.zrem(GENRE_FILMS_KEY.format(genre_id=genre_id), film_id)
+
+            score = UNRATED_SCORE if rating is None else -rating
+            for key in keys:
+                pipeline.zadd(key, {film_id: score})
+
+            pipeline.hset(FILM_GENRES_KEY, film_id, ",".join(sorted(genre_ids)))
+        pipeline.execute()
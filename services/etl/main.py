@@ -1,12 +1,68 @@
 import os
 import time
 
+from logic.cache_invalidator import CacheInvalidator
 from logic.elastic_loader import ElasticSearchLoader
 from logic.postgres_producer import PostgresProducer
+from logic.rating_index import RATING_INDEX_FIELDS, FilmRatingIndex
+from redis import Redis, RedisError
+from requests import RequestException
+from schemas.elasticsearch import ESMovieDocument
+from utils.logging_settings import logger
 from utils.settings import settings
 from utils.state import State
 from utils.storages.json_storage import JsonFileStorage
 
+# Индекс персон, для которого уже выгружены все персоны
+PERSONS_INDEX_STATE_KEY = "persons_index_name"
+
+
+def get_persons_ids(
+    films: dict[str, ESMovieDocument], elastic_loader: ElasticSearchLoader
+) -> set[str]:
+    """Участники фильмов, фильмографию которых нужно пересобрать.
+
+    Кроме текущих участников в неё входят персоны, у которых фильм уже есть
+    в документе: если участника убрали из фильма, фильм нужно убрать и
+    из его фильмографии.
+    """
+    current = {str(person.id) for film in films.values() for person in film.persons}
+    films_ids = [str(film.id) for film in films.values()]
+    return current | elastic_loader.get_persons_with_films(films_ids)
+
+
+def ensure_persons_backfilled(
+    persons_index: str, postgres_producer: PostgresProducer, state: State
+) -> None:
+    """Выгрузить всех персон заново, если поменялось описание их индекса.
+
+    Документы переносятся в новый индекс через _reindex без изменений,
+    поэтому новые поля появляются в них только после повторной выгрузки.
+    """
+    if state.get_state_json(PERSONS_INDEX_STATE_KEY) == persons_index:
+        return
+
+    postgres_producer.reset_modified_persons()
+    state.set_state_json(PERSONS_INDEX_STATE_KEY, persons_index)
+
+
+def ensure_rating_index(
+    rating_index: FilmRatingIndex, elastic_loader: ElasticSearchLoader
+) -> None:
+    """Перестроить списки по рейтингу, если они не готовы.
+
+    Пока списков нет, API читает фильмы из Elasticsearch, поэтому ошибка
+    не прерывает загрузку и перестройка повторится на следующем цикле.
+    """
+    try:
+        if not rating_index.is_ready():
+            rating_index.rebuild(
+                elastic_loader.iter_documents("movies", RATING_INDEX_FIELDS)
+            )
+    except (RedisError, RequestException):
+        logger.warning("Не удалось перестроить списки фильмов по рейтингу")
+
+
 if __name__ == "__main__":
 
     postgres_connect_data = {
@@ -21,18 +77,32 @@ if __name__ == "__main__":
     state = State(storage=storage)
 
     postgres_producer = PostgresProducer(postgres_connect_data, state)
-    elastic_loader = ElasticSearchLoader(settings.es_url)
+    redis = Redis(host=settings.redis_host, port=int(settings.redis_port))
+    cache_invalidator = CacheInvalidator(redis, settings.cache_invalidation_channel)
+    rating_index = FilmRatingIndex(redis)
+    elastic_loader = ElasticSearchLoader(
+        settings.es_url, cache_invalidator, rating_index
+    )
 
-    elastic_loader.create_indexes()
+    indexes = elastic_loader.create_indexes()
+    ensure_persons_backfilled(indexes["persons"], postgres_producer, state)
+    has_unannounced_changes = False
     while True:
+        ensure_rating_index(rating_index, elastic_loader)
+
+        # Фильмография участников изменённых фильмов хранится в их документах
+        credited_persons_ids: set[str] = set()
+
         films = postgres_producer.get_films_by_modified_self()
         count = elastic_loader.load(films, "movies")
+        credited_persons_ids.update(get_persons_ids(films, elastic_loader))
 
         films = postgres_producer.get_film_works_by_modified_genres()
         count += elastic_loader.load(films, "movies")
 
         films = postgres_producer.get_film_works_by_modified_persons()
         count += elastic_loader.load(films, "movies")
+        credited_persons_ids.update(get_persons_ids(films, elastic_loader))
 
         genres = postgres_producer.get_modified_genres()
         count += elastic_loader.load(genres, "genres")
@@ -40,5 +110,17 @@ if __name__ == "__main__":
         persons = postgres_producer.get_modified_persons()
         count += elastic_loader.load(persons, "persons")
 
-        if count == 0:
-            time.sleep(1)
+        persons = postgres_producer.get_persons_by_ids(
+            credited_persons_ids - {str(person_id) for person_id in persons}
+        )
+        elastic_loader.load(persons, "persons")
+
+        if count > 0:
+            has_unannounced_changes = True
+            continue
+
+        if has_unannounced_changes:
+            cache_invalidator.publish_cycle_completed()
+            has_unannounced_changes = False
+
+        time.sleep(1)
@@ -1,4 +1,4 @@
-from typing import Any, Set
+from typing import Any, List, Set
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -59,6 +59,25 @@ class ESMovieDocument(BaseModel):
             UUID: lambda v: str(v),
         }
 
+    @property
+    def persons(self) -> Set[Person]:
+        """Все участники фильма вне зависимости от роли."""
+        return self.actors | self.directors | self.writers
+
+
+class PersonFilm(BaseModel):
+    id: UUID  # noqa: VNE003, A003
+    roles: List[str]
+
+    class Config:
+        json_encoders = {
+            UUID: lambda v: str(v),
+        }
+
+
+class ESPersonDocument(Person):
+    films: List[PersonFilm]
+
 
 class Genre(GenreBaseInfo):
     description: str | None
@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     project_name: str
     redis_host: str
     redis_port: str
+    cache_invalidation_channel: str = "cache:invalidation"
 
 
 settings = Settings(_env_file=dotenv_path, _env_file_encoding="utf-8")  # type: ignore
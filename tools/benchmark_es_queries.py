@@ -0,0 +1,126 @@
+"""Compares film list queries in the scoring and in the filter context.
+
+Runs the genre and person film queries the API used to send, the same
+restrictions moved to ``bool.filter``, and the filter queries with the
+shard request cache, against a running Elasticsearch with loaded movies.
+
+Usage: python tools/benchmark_es_queries.py [ES_URL] [ITERATIONS]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from elasticsearch import AsyncElasticsearch
+
+sys.path.append(str(Path(__file__).parent.parent / "services" / "api" / "src"))
+
+from services import queries  # noqa: E402
+
+INDEX = "movies"
+PAGE_SIZE = 50
+SORT = [{"imdb_rating": {"order": "desc"}}, {"id": {"order": "asc"}}]
+SAMPLE_SIZE = 20
+
+
+def scored_films_by_genre(genre_id: str) -> dict[str, Any]:
+    return queries.nested_term("genres", "id", genre_id)
+
+
+def scored_films_with_person(person_id: str) -> dict[str, Any]:
+    return {
+        "bool": {
+            "should": [
+                queries.nested_term(path, "id", person_id)
+                for path in queries.FILM_CREDIT_PATHS
+            ]
+        }
+    }
+
+
+async def get_sample_ids(elastic: AsyncElasticsearch) -> tuple[list, list]:
+    response = await elastic.search(
+        index=INDEX,
+        size=SAMPLE_SIZE,
+        query={"function_score": {"random_score": {}}},
+        source_includes=["genres.id", "actors.id"],
+    )
+    hits = [hit["_source"] for hit in response["hits"]["hits"]]
+    genre_ids = {genre["id"] for hit in hits for genre in hit["genres"]}
+    person_ids = {actor["id"] for hit in hits for actor in hit["actors"]}
+    return sorted(genre_ids), sorted(person_ids)
+
+
+async def measure(
+    elastic: AsyncElasticsearch,
+    build_query: Callable[[str], dict[str, Any]],
+    ids: list[str],
+    iterations: int,
+    request_cache: bool = False,
+) -> tuple[list[float], list[int]]:
+    await elastic.indices.clear_cache(index=INDEX)
+
+    latencies, took = [], []
+    for _ in range(iterations):
+        for item_id in ids:
+            started_at = time.perf_counter()
+            response = await elastic.search(
+                index=INDEX,
+                query=build_query(item_id),
+                size=PAGE_SIZE,
+                sort=SORT,
+                source_includes=["id", "title", "imdb_rating"],
+                request_cache=True if request_cache else None,
+            )
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            took.append(response["took"])
+
+    return latencies, took
+
+
+def report(name: str, latencies: list[float], took: list[int]) -> None:
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(
+        f"{name:<40} median {statistics.median(latencies):7.2f} ms  "
+        f"p95 {p95:7.2f} ms  es took median {statistics.median(took):5.1f} ms"
+    )
+
+
+async def main() -> None:
+    es_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:9200"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    elastic = AsyncElasticsearch(hosts=es_url)
+    try:
+        genre_ids, person_ids = await get_sample_ids(elastic)
+        cases = [
+            ("genre", genre_ids, scored_films_by_genre, queries.films_by_genre),
+            (
+                "person",
+                person_ids,
+                scored_films_with_person,
+                queries.films_with_person,
+            ),
+        ]
+        for name, ids, scored, filtered in cases:
+            report(
+                f"{name}: scoring context",
+                *await measure(elastic, scored, ids, iterations),
+            )
+            report(
+                f"{name}: filter context",
+                *await measure(elastic, filtered, ids, iterations),
+            )
+            report(
+                f"{name}: filter context + request cache",
+                *await measure(elastic, filtered, ids, iterations, True),
+            )
+    finally:
+        await elastic.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
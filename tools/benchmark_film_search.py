@@ -0,0 +1,167 @@
+"""Compares film full-text search over six fields and over search_text.
+
+Loads the functional test movies into two temporary indexes, one with the
+current mapping and one without the copy_to search_text field. It runs
+the same queries against both: title words, person names and their
+misspelled variants. Reports latency and how many of the top hits match.
+
+Usage: python tools/benchmark_film_search.py [ES_URL] [ITERATIONS]
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import sys
+from copy import deepcopy
+from pathlib import Path
+from typing import Any
+
+from benchmark_es_queries import report
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+
+API_ROOT = Path(__file__).parent.parent / "services" / "api"
+sys.path.append(str(API_ROOT / "src"))
+
+from services import queries  # noqa: E402
+
+FUNCTIONAL_TESTS = API_ROOT / "tests" / "functional"
+MAPPING_PATH = FUNCTIONAL_TESTS / "resources" / "es_movies_mapping.json"
+ASSETS_PATH = FUNCTIONAL_TESTS / "assets" / "es_movies.json"
+
+COMBINED_INDEX = "benchmark_movies_combined"
+SEPARATE_INDEX = "benchmark_movies_separate"
+SEPARATE_FIELDS = (
+    "title^3",
+    "description",
+    "genres_names",
+    "actors_names",
+    "directors_names",
+    "writers_names",
+)
+TOP_HITS = 10
+QUERIES_COUNT = 50
+
+
+def without_search_text(mapping: dict[str, Any]) -> dict[str, Any]:
+    mapping = deepcopy(mapping)
+    properties = mapping["mappings"]["properties"]
+    del properties["search_text"]
+    for field in properties.values():
+        field.pop("copy_to", None)
+    return mapping
+
+
+def misspell(word: str) -> str:
+    if len(word) < 5:
+        return word
+    letters = list(word)
+    del letters[random.randrange(1, len(word) - 1)]
+    return "".join(letters)
+
+
+def sample_queries(movies: list[dict[str, Any]]) -> list[str]:
+    random.seed(0)
+    samples = []
+    for movie in random.sample(movies, QUERIES_COUNT):
+        title_word = random.choice(movie["title"].split())
+        samples += [title_word, misspell(title_word)]
+        if movie["actors_names"]:
+            name = random.choice(movie["actors_names"])
+            samples += [name, " ".join(misspell(part) for part in name.split())]
+    return samples
+
+
+def overlap(expected: list[str], actual: list[str]) -> float:
+    if not expected:
+        return 1.0 if not actual else 0.0
+    return len(set(expected) & set(actual)) / len(expected)
+
+
+async def fill_index(
+    elastic: AsyncElasticsearch,
+    index: str,
+    mapping: dict[str, Any],
+    movies: list[dict[str, Any]],
+) -> None:
+    if await elastic.indices.exists(index=index):
+        await elastic.indices.delete(index=index)
+
+    await elastic.indices.create(index=index, **mapping)
+    await async_bulk(
+        elastic,
+        ({"_index": index, "_id": movie["id"], "_source": movie} for movie in movies),
+        refresh="wait_for",
+    )
+
+
+async def run(
+    elastic: AsyncElasticsearch,
+    index: str,
+    fields: tuple[str, ...],
+    search_queries: list[str],
+    iterations: int,
+) -> tuple[list[float], list[int], dict[str, list[str]]]:
+    latencies, took, hits = [], [], {}
+    loop = asyncio.get_running_loop()
+    for _ in range(iterations):
+        for query in search_queries:
+            started_at = loop.time()
+            response = await elastic.search(
+                index=index,
+                query=queries.full_text(query, fields),
+                size=TOP_HITS,
+                source=False,
+                track_total_hits=False,
+            )
+            latencies.append((loop.time() - started_at) * 1000)
+            took.append(response["took"])
+            hits[query] = [hit["_id"] for hit in response["hits"]["hits"]]
+
+    return latencies, took, hits
+
+
+async def main() -> None:
+    es_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:9200"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    mapping = json.loads(MAPPING_PATH.read_text())
+    movies = json.loads(ASSETS_PATH.read_text())
+    search_queries = sample_queries(movies)
+
+    elastic = AsyncElasticsearch(hosts=es_url)
+    try:
+        await fill_index(elastic, COMBINED_INDEX, mapping, movies)
+        await fill_index(elastic, SEPARATE_INDEX, without_search_text(mapping), movies)
+
+        *separate, separate_hits = await run(
+            elastic, SEPARATE_INDEX, SEPARATE_FIELDS, search_queries, iterations
+        )
+        *combined, combined_hits = await run(
+            elastic,
+            COMBINED_INDEX,
+            queries.FILM_SEARCH_FIELDS,
+            search_queries,
+            iterations,
+        )
+        report("six fields", *separate)
+        report("title + search_text", *combined)
+
+        overlaps = [
+            overlap(separate_hits[query], combined_hits[query])
+            for query in search_queries
+        ]
+        print(
+            f"top {TOP_HITS} overlap: mean {statistics.mean(overlaps):.0%}, "
+            f"same hits for {sum(o == 1 for o in overlaps)} "
+            f"of {len(search_queries)} queries"
+        )
+    finally:
+        for index in (COMBINED_INDEX, SEPARATE_INDEX):
+            await elastic.indices.delete(index=index, ignore_unavailable=True)
+        await elastic.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())